@@ -1,202 +1,289 @@
 import logging
 import random
-import time
-import traceback
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
-from bot.config_loader import config
 from bot.utils.helpers import (
-    wait_random, human_typing,
-    click_next_button, validate_radio_selected, validate_text_input
+    log_event, wait_random, human_typing, human_insert_text, wait_for_clickable, wait_for_next_step,
+    wait_for_next_button, wait_until_enabled, wait_until_checked, fill_text_input, click_next_button,
+    native_click, js_force_select, select_radio_and_next, select_radios_and_next,
+    find_all_cached, get_wait, cdp_eval, FORCE_SELECT_JS
 )
 from bot.utils.avis_manager import AvisManager
 from bot.scheduler import scheduler
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-import undetected_chromedriver as uc
-from selenium_stealth import stealth
-
-from bot.config import (
-    XPATHS, TIMING, TIMEOUTS, CHROME_OPTIONS, 
-    AVIS_MAPPING, SERVICE_TYPE_MAPPING,
-    RESTAURANT_NUMBER, SURVEY_URL, BASE_DIR
-)
+from selenium.common.exceptions import TimeoutException
+
+from bot.config import TIMEOUTS, CSS_SELECTORS, AVIS_MAPPING, RESTAURANT_NUMBER
 
 # Logger (configuration centralisée dans main.py)
 logger = logging.getLogger(__name__)
 
-# Dictionnaire pour stocker les données de session
-session_data = {
-    'start_time': None,
-    'current_category': None,
-    'current_avis_file': None,
-    'requires_extra_steps': False,
-    'captcha_detected': False
-}
+# Localisateurs partagés par les étapes (construits une seule fois à l'import)
+LOC_RADIO = (By.CSS_SELECTOR, CSS_SELECTORS['radio_input'])
+LOC_DATE = (By.CSS_SELECTOR, CSS_SELECTORS['date_input'])
+LOC_HM = (By.CSS_SELECTOR, CSS_SELECTORS['time_inputs'])
+LOC_RESTO = (By.CSS_SELECTOR, CSS_SELECTORS['restaurant_input'])
+# contains(., ...) couvre déjà contains(text(), ...) : une seule forme par libellé
+LOC_START = (By.XPATH, "//button[contains(., 'Commencer') or contains(., 'Start')] | //input[@type='submit']")
+# Les variantes (placeholder, class/id 'comment') étaient toutes des textarea : un sélecteur suffit
+LOC_TEXTAREA = (By.CSS_SELECTOR, CSS_SELECTORS['textarea'])
+
 
-# Instance globale du gestionnaire d'avis (cache)
-avis_manager = AvisManager(AVIS_MAPPING)
+@dataclass(slots=True)
+class SurveyState:
+    """État d'un questionnaire en cours, passé explicitement à chaque étape (un objet par questionnaire)."""
+    start_time: Optional[datetime] = None
+    requires_extra_steps: Optional[str] = None
+    order_location: Optional[str] = None
+    consumption_type: Optional[str] = None
+    current_category: Optional[str] = None
+    current_avis_file: Optional[str] = None
+    captcha_detected: bool = False
+
+# Instance globale du gestionnaire d'avis (cache), créée au premier besoin
+_avis_manager = None
+
+def get_avis_manager() -> AvisManager:
+    """Retourne le gestionnaire d'avis global (initialisation paresseuse)."""
+    global _avis_manager
+    if _avis_manager is None:
+        _avis_manager = AvisManager(AVIS_MAPPING)
+    return _avis_manager
 
 # setup_driver et cleanup_driver sont définies dans bot.utils.driver_manager
-# wait_random et human_typing sont importées depuis bot.utils.helpers
+# wait_random et human_typing sont utilisées directement depuis bot.utils.helpers (aucune redéfinition locale)
 
-def pick_avis(category: str = None) -> str:
+def pick_avis(category: str = None, state: Optional[SurveyState] = None) -> str:
     """Sélectionne un avis aléatoire en fonction de la catégorie (utilise le cache)."""
     try:
-        # Utiliser le gestionnaire d'avis avec cache
+        # Les listes d'avis restent en cache entre les questionnaires (relues si le fichier change)
+        avis_manager = get_avis_manager()
         selected_avis = avis_manager.load_avis(category)
-        session_data['current_avis_file'] = avis_manager.avis_mapping.get(category or 'drive')
+        if state:
+            state.current_avis_file = avis_manager.avis_mapping.get(category or 'drive')
         
         return selected_avis
         
     except Exception as e:
-        logger.error(f"❌ Erreur sélection avis ({category}): {e}")
+        logger.error("❌ Erreur sélection avis (%s): %s", category, e)
         return "Excellent service, très satisfait de ma visite !"
 
 
+def get_radios(driver, timeout: float = 0, refresh: bool = False):
+    """Boutons radio de la page courante (cache vidé à chaque changement de page)."""
+    return find_all_cached(driver, LOC_RADIO, timeout=timeout, refresh=refresh)
+
+
+# Indicateurs de CAPTCHA : attributs en CSS (moteur de sélecteurs de Blink, plus rapide que XPath),
+# seuls les libellés textuels restent en XPath ; 'captcha' couvre aussi 'recaptcha'
+_CAPTCHA_CSS = ", ".join((
+    "iframe[src*='captcha']",
+    "div[class*='captcha']",
+    "div[id*='captcha']",
+    "img[alt*='captcha' i]",
+))
+_CAPTCHA_TEXT_XPATH = " | ".join((
+    "//*[contains(text(), 'CAPTCHA')]",
+    "//*[contains(text(), 'captcha')]",
+    "//*[contains(text(), 'Vérification')]",
+    "//*[contains(text(), 'vérification')]",
+))
+
+# Les deux recherches dans le même appel JS, arrêt au premier élément trouvé
+_CAPTCHA_ELEMENTS_SCRIPT = """
+    return !!(document.querySelector(arguments[0]) ||
+              document.evaluate(arguments[1], document, null,
+                                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue);
+"""
+_CAPTCHA_KEYWORDS = ('captcha', 'recaptcha', 'hcaptcha', 'vérification humaine')
+
+# Recherche des mots-clés dans le texte visible côté navigateur : seul un booléen transite.
+# Parcours des nœuds texte avec arrêt au premier résultat (innerText forcerait un layout
+# complet et matérialiserait tout le texte) ; la visibilité n'est vérifiée qu'en cas de résultat.
+_CAPTCHA_TEXT_SCRIPT = """
+    var keywords = arguments[0];
+    if (!document.body) return false;
+    var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, {
+        acceptNode: function(node) {
+            var tag = node.parentNode && node.parentNode.nodeName;
+            return (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'NOSCRIPT')
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+        var text = node.nodeValue.toLowerCase();
+        for (var i = 0; i < keywords.length; i++) {
+            if (text.indexOf(keywords[i]) !== -1 && node.parentNode.getClientRects().length) return true;
+        }
+    }
+    return false;
+"""
+
+# Empreinte de la page : timeOrigin change à chaque navigation, même à URL identique
+_PAGE_FINGERPRINT_SCRIPT = """
+    return [location.href, performance.timeOrigin, document.readyState,
+            document.body ? document.body.childElementCount : 0];
+"""
+
+def _scan_captcha(driver) -> bool:
+    """Recherche effective d'un CAPTCHA (éléments puis texte visible)."""
+    # Rechercher des éléments typiques de CAPTCHA
+    if cdp_eval(driver, _CAPTCHA_ELEMENTS_SCRIPT, _CAPTCHA_CSS, _CAPTCHA_TEXT_XPATH):
+        logger.error("🚨 CAPTCHA détecté sur la page!")
+        return True
+    
+    # Vérifier aussi dans le texte visible (hors scripts et styles)
+    try:
+        if cdp_eval(driver, _CAPTCHA_TEXT_SCRIPT, _CAPTCHA_KEYWORDS):
+            logger.error("🚨 CAPTCHA détecté dans le contenu de la page!")
+            return True
+    except:
+        pass
+    
+    return False
+
 def detect_captcha(driver) -> bool:
     """
     Détecte la présence d'un CAPTCHA sur la page (#17).
     
+    Le résultat est mémorisé sur le driver avec l'empreinte de la page :
+    un nouvel appel sur la même page ne refait pas la recherche.
+    
     Returns:
         True si un CAPTCHA est détecté, False sinon
     """
     try:
-        # Rechercher des éléments typiques de CAPTCHA
-        captcha_indicators = [
-            "//iframe[contains(@src, 'recaptcha')]",
-            "//iframe[contains(@src, 'captcha')]",
-            "//div[contains(@class, 'recaptcha')]",
-            "//div[contains(@class, 'captcha')]",
-            "//div[contains(@id, 'recaptcha')]",
-            "//div[contains(@id, 'captcha')]",
-            "//img[contains(@alt, 'CAPTCHA')]",
-            "//img[contains(@alt, 'captcha')]",
-            "//*[contains(text(), 'CAPTCHA')]",
-            "//*[contains(text(), 'captcha')]",
-            "//*[contains(text(), 'Vérification')]",
-            "//*[contains(text(), 'vérification')]",
-        ]
-        
-        for selector in captcha_indicators:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                if elements:
-                    logger.error("🚨 CAPTCHA détecté sur la page!")
-                    return True
-            except:
-                continue
-        
-        # Vérifier aussi dans le texte de la page
-        try:
-            page_text = driver.page_source.lower()
-            captcha_keywords = ['captcha', 'recaptcha', 'hcaptcha', 'vérification humaine']
-            if any(keyword in page_text for keyword in captcha_keywords):
-                # Vérifier que ce n'est pas juste dans le code source
-                body_text = driver.find_element(By.TAG_NAME, "body").text.lower()
-                if any(keyword in body_text for keyword in captcha_keywords):
-                    logger.error("🚨 CAPTCHA détecté dans le contenu de la page!")
-                    return True
-        except:
-            pass
+        fingerprint = cdp_eval(driver, _PAGE_FINGERPRINT_SCRIPT)
+        cached = getattr(driver, '_captcha_check', None)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
         
-        return False
+        found = _scan_captcha(driver)
+        driver._captcha_check = (fingerprint, found)
+        return found
         
     except Exception as e:
-        logger.warning(f"⚠️ Erreur lors de la détection CAPTCHA: {e}")
+        logger.warning("⚠️ Erreur lors de la détection CAPTCHA: %s", e)
         return False
 
 # ============================================================================
 # ÉTAPES DU QUESTIONNAIRE (ordre exact selon le code fourni)
 # ============================================================================
 
-def step_1_start_survey(driver) -> bool:
+def step_1_start_survey(driver, state: SurveyState) -> bool:
     """Étape 1: Page d'accueil - Cliquer sur 'Commencer l'enquête'"""
     logger.info("🏁 Étape 1: Page d'accueil - Commencer l'enquête")
     try:
         # Détecter CAPTCHA (#17)
         if detect_captcha(driver):
             logger.error("🚨 CAPTCHA détecté - Arrêt du bot")
-            session_data['captcha_detected'] = True
+            state.captcha_detected = True
             return False
         
-        wait_random(1, 2)  # Optimisé pour vitesse
-        
-        # Chercher le bouton "Commencer l'enquête" ou "Commencer"
-        start_button = None
-        selectors = [
-            "//button[contains(text(), 'Commencer')]",
-            "//button[contains(., 'Commencer')]",
-            "//button[contains(text(), 'Start')]",
-            "//input[@type='submit']"
-        ]
-        
-        for selector in selectors:
-            try:
-                start_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                if start_button:
-                    break
-            except:
-                continue
+        # Chercher le bouton "Commencer l'enquête" ou "Commencer" (attente explicite, pas de délai fixe)
+        # Union XPath : une seule attente au lieu d'une attente par sélecteur
+        try:
+            start_button = wait_for_clickable(driver, LOC_START,
+                                              timeout=TIMEOUTS['element_wait'], min_pace=0.3, max_pace=0.8)
+        except TimeoutException:
+            start_button = None
         
         if not start_button:
             logger.error("❌ Bouton 'Commencer' non trouvé")
             return False
         
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", start_button)
-        wait_random(0.3, 0.8)  # Optimisé pour vitesse
-        driver.execute_script("arguments[0].click();", start_button)
+        native_click(driver, start_button)
         
         logger.info("✅ Bouton 'Commencer l'enquête' cliqué")
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=start_button)
         
     except Exception as e:
-        logger.error(f"❌ Étape 1 échouée: {str(e)}")
+        logger.error("❌ Étape 1 échouée: %s", e)
         return False
 
-def step_2_age_selection(driver) -> bool:
+def step_2_age_selection(driver, state: SurveyState) -> bool:
     """Étape 2: Sélection tranche d'âge (choix aléatoire, excluant 'moins de 15 ans')"""
     logger.info("👤 Étape 2: Sélection tranche d'âge")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver tous les boutons radio pour l'âge
-        radios_age = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        radios_age = get_radios(driver, timeout=10)
+        selected_radio = None
         
         if radios_age and len(radios_age) > 1:
             # Exclure le premier bouton (moins de 15 ans) et choisir parmi les autres
             eligible_radios = radios_age[1:]  # Exclut le premier élément
             selected_radio = random.choice(eligible_radios)
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
             logger.info("✅ Tranche d'âge sélectionnée (excluant 'moins de 15 ans')")
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_DATE, timeout=TIMEOUTS['element_wait'], previous=radios_age[0] if radios_age else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 2 échouée: {str(e)}")
+        logger.error("❌ Étape 2 échouée: %s", e)
         return False
 
-def step_3_ticket_info(driver) -> bool:
+# Définit ticketFields(dateSel, hmSel, restoSel) -> [date, heure, minute, restaurant] (null si absent)
+_TICKET_FIELDS_JS = """
+    function ticketFields(dateSel, hmSel, restoSel) {
+        var hm = document.querySelectorAll(hmSel);
+        return [
+            document.querySelector(dateSel),
+            hm.length > 0 ? hm[0] : null,
+            hm.length > 1 ? hm[1] : null,
+            document.querySelector(restoSel)
+        ];
+    }
+"""
+
+_TICKET_FIELDS_SCRIPT = _TICKET_FIELDS_JS + """
+    return ticketFields(arguments[0], arguments[1], arguments[2]);
+"""
+
+# Localisation + remplissage de tous les champs du ticket ; renvoie [champs, valeurs relues]
+_FILL_TICKET_SCRIPT = _TICKET_FIELDS_JS + """
+    var fields = ticketFields(arguments[0], arguments[1], arguments[2]), values = arguments[3];
+    var readBack = fields.map(function(field, i) {
+        if (!field) return null;
+        field.value = values[i];
+        field.dispatchEvent(new Event('input', { bubbles: true }));
+        field.dispatchEvent(new Event('change', { bubbles: true }));
+        return field.value;
+    });
+    return [fields, readBack];
+"""
+
+def _find_ticket_fields(driver):
+    """Retourne (date, heure, minute, restaurant) en un seul execute_script (None si absent)."""
+    return tuple(driver.execute_script(_TICKET_FIELDS_SCRIPT, LOC_DATE[1], LOC_HM[1], LOC_RESTO[1]))
+
+def _fill_ticket_fields(driver, values):
+    """Localise et remplit les 4 champs du ticket en un seul execute_script.
+    
+    Returns:
+        (champs, valeurs relues) ; None pour un champ absent
+    """
+    fields, read_back = driver.execute_script(_FILL_TICKET_SCRIPT, LOC_DATE[1], LOC_HM[1], LOC_RESTO[1], list(values))
+    return tuple(fields), tuple(read_back)
+
+def _check_ticket_field(driver, index, field, read_back, text, min_length) -> bool:
+    """Valide la valeur relue d'un champ du ticket ; en cas d'écart, nouvelle saisie de ce seul champ."""
+    value = (read_back or '').strip()
+    if len(value) >= min_length and value == text.strip():
+        return True
+    return fill_text_input(driver, field, text, min_length=min_length,
+                           relocate=lambda: _find_ticket_fields(driver)[index], use_js=True)
+
+def step_3_ticket_info(driver, state: SurveyState) -> bool:
     """Étape 3: Informations du ticket (date/heure/minute/numéro resto)"""
     logger.info("🎫 Étape 3: Informations du ticket")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Générer une heure de visite aléatoire réaliste via le scheduler
         visit_time = scheduler.get_random_visit_time()
         
@@ -206,73 +293,78 @@ def step_3_ticket_info(driver) -> bool:
         
         date_jour, heure, minute = visit_time
         
-        # 1. Saisir la date avec validation
+        # Tous les champs du ticket localisés et remplis en un seul aller-retour
+        fields, read_back = _fill_ticket_fields(driver, (date_jour, heure, minute, RESTAURANT_NUMBER))
+        date_field, heure_field, minute_field, restaurant_field = fields
+        
+        # 1. Valider la date (relue dans le même appel JS ; nouvelle saisie seulement si écart)
         try:
-            date_field = driver.find_element(By.XPATH, "//input[@placeholder='JJ/MM/AAAA']")
-            date_field.clear()
-            wait_random(0.1, 0.3)  # Optimisé pour vitesse
-            human_typing(date_field, date_jour)
-            if not validate_text_input(driver, date_field, expected_text=date_jour, min_length=8):
-                logger.warning("⚠️ Validation de la date échouée, mais on continue")
-            logger.info(f"✅ Date saisie: {date_jour}")
+            if date_field is not None:
+                if not _check_ticket_field(driver, 0, date_field, read_back[0], date_jour, min_length=8):
+                    logger.warning("⚠️ Validation de la date échouée, mais on continue")
+                logger.info("✅ Date saisie: %s", date_jour)
+            else:
+                logger.warning("⚠️ Champ date non trouvé")
         except:
             logger.warning("⚠️ Champ date non trouvé")
         
-        wait_random(0.3, 0.6)  # Optimisé pour vitesse
-        
-        # 2. Saisir heure et minute avec validation
+        # 2. Valider heure et minute
         try:
-            heure_fields = driver.find_elements(By.XPATH, "//input[@maxlength='2' and @type='text']")
-            if len(heure_fields) >= 2:
-                heure_fields[0].clear()
-                human_typing(heure_fields[0], heure)
-                if not validate_text_input(driver, heure_fields[0], expected_text=heure, min_length=1):
+            if heure_field is not None and minute_field is not None:
+                if not _check_ticket_field(driver, 1, heure_field, read_back[1], heure, min_length=1):
                     logger.warning("⚠️ Validation de l'heure échouée")
-                wait_random(0.2, 0.4)  # Optimisé pour vitesse
-                heure_fields[1].clear()
-                human_typing(heure_fields[1], minute)
-                if not validate_text_input(driver, heure_fields[1], expected_text=minute, min_length=1):
+                if not _check_ticket_field(driver, 2, minute_field, read_back[2], minute, min_length=1):
                     logger.warning("⚠️ Validation des minutes échouée")
-                logger.info(f"✅ Heure saisie: {heure}:{minute}")
+                logger.info("✅ Heure saisie: %s:%s", heure, minute)
+            else:
+                logger.warning("⚠️ Champs heure/minute non trouvés")
         except:
             logger.warning("⚠️ Champs heure/minute non trouvés")
         
-        wait_random(0.3, 0.6)  # Optimisé pour vitesse
-        
-        # 3. Saisir numéro restaurant (4 chiffres) avec validation
+        # 3. Valider le numéro restaurant (4 chiffres)
         try:
-            restaurant_field = driver.find_element(By.XPATH, "//input[@maxlength='4' and @type='text']")
-            restaurant_field.clear()
-            wait_random(0.1, 0.3)  # Optimisé pour vitesse
-            human_typing(restaurant_field, RESTAURANT_NUMBER)
-            if not validate_text_input(driver, restaurant_field, expected_text=RESTAURANT_NUMBER, min_length=4):
-                logger.warning("⚠️ Validation du numéro restaurant échouée")
-            logger.info(f"✅ Numéro restaurant saisi: {RESTAURANT_NUMBER}")
+            if restaurant_field is not None:
+                if not _check_ticket_field(driver, 3, restaurant_field, read_back[3], RESTAURANT_NUMBER, min_length=4):
+                    logger.warning("⚠️ Validation du numéro restaurant échouée")
+                logger.info("✅ Numéro restaurant saisi: %s", RESTAURANT_NUMBER)
+            else:
+                logger.warning("⚠️ Champ numéro restaurant non trouvé")
         except:
             logger.warning("⚠️ Champ numéro restaurant non trouvé")
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
+        # Cliquer sur Suivant (factorisé, attend que le bouton soit activé)
         if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=date_field)
         
     except Exception as e:
-        logger.error(f"❌ Étape 3 échouée: {str(e)}")
+        logger.error("❌ Étape 3 échouée: %s", e)
         return False
 
-def step_4_order_location(driver) -> bool:
+# Routage selon le lieu de commande (index de l'option) : (étapes supplémentaires, lieu)
+ORDER_ROUTING = (
+    ('borne_comptoir', 'borne'),     # 0 = Borne → étapes 4b (consommation) + 4c (récupération)
+    ('borne_comptoir', 'comptoir'),  # 1 = Comptoir → étapes 4b + 4c
+    (None, 'drive'),                 # 2 = Drive → pas d'étapes supplémentaires
+    (None, 'drive'),                 # 3 = Guichet extérieur → pas d'étapes supplémentaires
+    ('click_collect', 'cc_appli'),   # 4 = Click & Collect app mobile → étape 4d (lieu récupération)
+    ('click_collect', 'cc_site'),    # 5 = Click & Collect site web → étape 4d
+)
+
+_EXTRA_STEPS_INFO = {
+    'borne_comptoir': "ℹ️  Borne/Comptoir → Étapes supplémentaires: consommation + récupération",
+    'click_collect': "ℹ️  Click & Collect → Étape supplémentaire: lieu de récupération",
+}
+
+def step_4_order_location(driver, state: SurveyState) -> bool:
     """Étape 4: Lieu de commande (6 premières options seulement)"""
     logger.info("📍 Étape 4: Lieu de commande")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver tous les boutons radio
-        lieu_radios = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        lieu_radios = get_radios(driver, timeout=10)
+        selected_radio = None
         
         # Stocker l'index sélectionné pour savoir si on a des étapes supplémentaires
         selected_index = None
@@ -281,134 +373,92 @@ def step_4_order_location(driver) -> bool:
             # Choisir parmi les 6 premières options uniquement
             selected_index = random.randint(0, 5)
             selected_radio = lieu_radios[selected_index]
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
-            # Validation
-            if not validate_radio_selected(driver, selected_radio):
-                logger.warning("⚠️ Validation du radio échouée, nouvelle tentative...")
-                driver.execute_script("arguments[0].checked = true;", selected_radio)
-                driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", selected_radio)
             
-            # Déterminer le type d'étapes supplémentaires selon l'option choisie
-            # Index 0 = Borne → étapes 4b (consommation) + 4c (récupération)
-            # Index 1 = Comptoir → étapes 4b (consommation) + 4c (récupération)
-            # Index 2 = Drive → pas d'étapes supplémentaires
-            # Index 3 = Guichet extérieur → pas d'étapes supplémentaires
-            # Index 4 = Click & Collect app mobile → étape 4d (lieu récupération)
-            # Index 5 = Click & Collect site web → étape 4d (lieu récupération)
-            
-            if selected_index in [0, 1]:
-                # Borne ou Comptoir
-                session_data['requires_extra_steps'] = 'borne_comptoir'
-                session_data['order_location'] = 'borne' if selected_index == 0 else 'comptoir'
-                logger.info(f"✅ Lieu de commande sélectionné (option {selected_index + 1}/6)")
-                logger.info("ℹ️  Borne/Comptoir → Étapes supplémentaires: consommation + récupération")
-            elif selected_index in [4, 5]:
-                # Click & Collect
-                session_data['requires_extra_steps'] = 'click_collect'
-                session_data['order_location'] = 'cc_appli' if selected_index == 4 else 'cc_site'
-                logger.info(f"✅ Lieu de commande sélectionné (option {selected_index + 1}/6)")
-                logger.info("ℹ️  Click & Collect → Étape supplémentaire: lieu de récupération")
-            else:
-                # Drive ou Guichet extérieur → pas d'étapes supplémentaires
-                session_data['requires_extra_steps'] = None
-                session_data['current_category'] = 'drive'
-                logger.info(f"✅ Lieu de commande sélectionné (option {selected_index + 1}/6)")
-        
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+            # Déterminer le type d'étapes supplémentaires selon l'option choisie (voir ORDER_ROUTING)
+            extra_steps, order_location = ORDER_ROUTING[selected_index]
+            state.requires_extra_steps = extra_steps
+            state.order_location = order_location
+            if extra_steps is None:
+                state.current_category = 'drive'
+            logger.info("✅ Lieu de commande sélectionné (option %s/6)", selected_index + 1)
+            if extra_steps in _EXTRA_STEPS_INFO:
+                logger.info(_EXTRA_STEPS_INFO[extra_steps])
+        
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=lieu_radios[0] if lieu_radios else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 4 échouée: {str(e)}")
+        logger.error("❌ Étape 4 échouée: %s", e)
         return False
 
-def step_4b_consumption_type(driver) -> bool:
+def step_4b_consumption_type(driver, state: SurveyState) -> bool:
     """Étape 4b (conditionnelle): Sur place ou à emporter"""
     logger.info("🍽️ Étape 4b: Type de consommation (sur place / à emporter)")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver les boutons radio pour le type de consommation
-        consumption_radios = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        consumption_radios = get_radios(driver, timeout=10)
+        selected_radio = None
         
         if consumption_radios and len(consumption_radios) >= 2:
             # Choisir aléatoirement entre sur place (0) ou à emporter (1)
             selected_index = random.randint(0, 1)
             selected_radio = consumption_radios[selected_index]
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
             
             # Stocker le type de consommation
-            session_data['consumption_type'] = 'sur_place' if selected_index == 0 else 'emporter'
-            logger.info(f"✅ Type de consommation sélectionné: {session_data['consumption_type']}")
+            state.consumption_type = 'sur_place' if selected_index == 0 else 'emporter'
+            logger.info("✅ Type de consommation sélectionné: %s", state.consumption_type)
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=consumption_radios[0] if consumption_radios else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 4b échouée: {str(e)}")
+        logger.error("❌ Étape 4b échouée: %s", e)
         return False
 
-def step_4c_pickup_location(driver) -> bool:
+def step_4c_pickup_location(driver, state: SurveyState) -> bool:
     """Étape 4c (conditionnelle Borne/Comptoir): Où avez-vous récupéré votre commande"""
     logger.info("📦 Étape 4c: Lieu de récupération de la commande (Borne/Comptoir)")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver les boutons radio pour le lieu de récupération
-        pickup_radios = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        pickup_radios = get_radios(driver, timeout=10)
+        selected_radio = None
         
         if pickup_radios and len(pickup_radios) >= 2:
             # Choisir aléatoirement entre "Au comptoir" (0) ou "En service à table" (1)
             selected_radio = random.choice(pickup_radios[:2])
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
             
             # Définir la catégorie finale pour les avis
-            order_loc = session_data.get('order_location', 'borne')
-            consumption = session_data.get('consumption_type', 'sur_place')
-            session_data['current_category'] = f"{order_loc}_{consumption}"
-            logger.info(f"✅ Lieu de récupération sélectionné - Catégorie: {session_data['current_category']}")
+            order_loc = state.order_location or 'borne'
+            consumption = state.consumption_type or 'sur_place'
+            state.current_category = f"{order_loc}_{consumption}"
+            logger.info("✅ Lieu de récupération sélectionné - Catégorie: %s", state.current_category)
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=pickup_radios[0] if pickup_radios else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 4c échouée: {str(e)}")
+        logger.error("❌ Étape 4c échouée: %s", e)
         return False
 
-def step_4d_click_collect_pickup(driver) -> bool:
+def step_4d_click_collect_pickup(driver, state: SurveyState) -> bool:
     """Étape 4d (conditionnelle Click & Collect): Où avez-vous récupéré votre commande"""
     logger.info("📦 Étape 4d: Lieu de récupération Click & Collect")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver les boutons radio pour le lieu de récupération Click & Collect
-        pickup_radios = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        pickup_radios = get_radios(driver, timeout=10)
+        selected_radio = None
         
         if pickup_radios and len(pickup_radios) >= 4:
             # Choisir aléatoirement parmi les 4 options:
@@ -418,187 +468,142 @@ def step_4d_click_collect_pickup(driver) -> bool:
             # 3 = A l'extérieur du restaurant
             selected_index = random.randint(0, 3)
             selected_radio = pickup_radios[selected_index]
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
             
             # Définir la catégorie finale pour les avis
-            order_loc = session_data.get('order_location', 'cc_appli')
+            order_loc = state.order_location or 'cc_appli'
             pickup_locations = ['comptoir', 'drive', 'guichet', 'exterieur']
-            session_data['current_category'] = f"{order_loc}_{pickup_locations[selected_index]}"
-            logger.info(f"✅ Lieu de récupération Click & Collect sélectionné - Catégorie: {session_data['current_category']}")
+            state.current_category = f"{order_loc}_{pickup_locations[selected_index]}"
+            logger.info("✅ Lieu de récupération Click & Collect sélectionné - Catégorie: %s", state.current_category)
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=pickup_radios[0] if pickup_radios else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 4d échouée: {str(e)}")
+        logger.error("❌ Étape 4d échouée: %s", e)
         return False
 
-def find_best_satisfaction_smiley(driver, all_radios):
-    """Trouve le smiley de meilleure satisfaction en analysant les attributs."""
+# Sélecteurs précis évalués dans la page, par ordre de fiabilité (le premier qui correspond gagne)
+# Structure Medallia: aria-posinset="1" + aria-label="Très satisfait" + value="1"
+_BEST_SMILEY_SELECTORS = (
+    ('aria-label', "[aria-label*='très satisfait' i], [aria-label*='very satisfied' i]"),
+    ('value=1', "[value='1']"),
+    ('aria-posinset=1', "[aria-posinset='1']"),
+)
+
+# Choix du meilleur smiley puis sélection insistante, dans le même appel JS
+_BEST_SMILEY_SCRIPT = FORCE_SELECT_JS + """
+    var radios = Array.from(arguments[0]), selectors = arguments[1];
+    function pick() {
+        for (var s = 0; s < selectors.length; s++) {
+            for (var i = 0; i < radios.length; i++) {
+                if (radios[i].matches(selectors[s][1])) {
+                    return {index: i, strategy: selectors[s][0],
+                            label: selectors[s][0] === 'aria-label' ? radios[i].getAttribute('aria-label') : null};
+                }
+            }
+        }
+        return radios.length ? {index: 0, strategy: 'premier de la liste', label: null} : null;
+    }
+    var best = pick();
+    if (best) best.checked = forceSelect(radios[best.index]);
+    return best;
+"""
+
+def select_best_satisfaction_smiley(driver, all_radios):
+    """
+    Trouve et coche le smiley de meilleure satisfaction (analyse + sélection en un seul appel JS).
+    
+    Returns:
+        (smiley, coché) ou None si aucun smiley n'a été trouvé
+    """
     try:
-        logger.info(f"🔍 Analyse de {len(all_radios)} smileys pour trouver le vert foncé...")
+        logger.info("🔍 Analyse de %s smileys pour trouver le vert foncé...", len(all_radios))
         
-        smiley_data = []
-        for idx, radio in enumerate(all_radios):
-            try:
-                # Récupérer tous les attributs possibles
-                value = driver.execute_script("return arguments[0].value;", radio)
-                aria_label = driver.execute_script("return arguments[0].getAttribute('aria-label');", radio)
-                aria_posinset = driver.execute_script("return arguments[0].getAttribute('aria-posinset');", radio)
-                data_value = driver.execute_script("return arguments[0].getAttribute('data-value');", radio)
-                data_mds_value = driver.execute_script("return arguments[0].getAttribute('data-mds-value');", radio)
-                name = driver.execute_script("return arguments[0].name;", radio)
-                id_attr = driver.execute_script("return arguments[0].id;", radio)
-                
-                # Récupérer les classes du label parent
-                parent_classes = driver.execute_script("""
-                    var label = arguments[0].closest('label');
-                    return label ? label.className : '';
-                """, radio)
-                
-                smiley_data.append({
-                    'index': idx,
-                    'element': radio,
-                    'value': value,
-                    'aria_label': aria_label,
-                    'aria_posinset': aria_posinset,
-                    'data_value': data_value,
-                    'data_mds_value': data_mds_value,
-                    'name': name,
-                    'id': id_attr,
-                    'parent_classes': parent_classes
-                })
-                
-                logger.info(f"  Smiley {idx}: value={value}, aria-label=\"{aria_label}\", aria-posinset={aria_posinset}")
-                
-            except Exception as e:
-                logger.warning(f"  ⚠️ Erreur analyse smiley {idx}: {e}")
-        
-        # Trouver le meilleur smiley
-        # Structure Medallia: aria-posinset="1" + aria-label="Très satisfait" + value="1"
-        best_smiley = None
-        
-        # Stratégie 1: Chercher aria-label="Très satisfait" (le plus fiable)
-        for data in smiley_data:
-            aria = str(data['aria_label']).lower() if data['aria_label'] else ''
-            if 'très satisfait' in aria or 'very satisfied' in aria:
-                logger.info(f"✅ Smiley trouvé par aria-label=\"{data['aria_label']}\" (index {data['index']})")
-                best_smiley = data['element']
-                break
-        
-        # Stratégie 2: Chercher value="1" (Medallia utilise 1=meilleur, 5=pire)
-        if not best_smiley:
-            for data in smiley_data:
-                if data['value'] == '1':
-                    logger.info(f"✅ Smiley trouvé par value=1 (index {data['index']})")
-                    best_smiley = data['element']
-                    break
-        
-        # Stratégie 3: Chercher aria-posinset="1"
-        if not best_smiley:
-            for data in smiley_data:
-                if data['aria_posinset'] == '1':
-                    logger.info(f"✅ Smiley trouvé par aria-posinset=1 (index {data['index']})")
-                    best_smiley = data['element']
-                    break
-        
-        # Stratégie 4: Prendre le premier (généralement le meilleur sur Medallia)
-        if not best_smiley and smiley_data:
-            best_smiley = smiley_data[0]['element']
-            logger.info(f"✅ Smiley sélectionné: premier de la liste (index 0)")
-        
-        return best_smiley
+        best = driver.execute_script(_BEST_SMILEY_SCRIPT, all_radios, _BEST_SMILEY_SELECTORS)
+        if not best:
+            return None
+        
+        if best['label']:
+            logger.info("✅ Smiley trouvé par aria-label=\"%s\" (index %s)", best['label'], best['index'])
+        else:
+            logger.info("✅ Smiley trouvé par %s (index %s)", best['strategy'], best['index'])
+        log_event(logger, "smiley_selected", logging.DEBUG, index=best['index'], strategy=best['strategy'])
+        
+        # Les WebElements restent côté Python: correspondance par index
+        return all_radios[best['index']], bool(best['checked'])
         
     except Exception as e:
-        logger.error(f"❌ Erreur lors de l'analyse des smileys: {e}")
-        return all_radios[0] if all_radios else None
+        logger.error("❌ Erreur lors de l'analyse des smileys: %s", e)
+        return (all_radios[0], js_force_select(driver, all_radios[0])) if all_radios else None
 
-def step_5_satisfaction_comment(driver) -> bool:
+_TEXTAREA_VALUE_SCRIPT = """
+    var el = document.querySelector(arguments[0]);
+    return el ? (el.value || el.textContent || el.innerHTML) : null;
+"""
+
+def step_5_satisfaction_comment(driver, state: SurveyState) -> bool:
     """Étape 5: Satisfaction générale (premier smiley vert foncé) + commentaire"""
     logger.info("😊 Étape 5: Satisfaction générale + commentaire")
     try:
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        
         # 1. OBLIGATOIRE: Cliquer sur le smiley vert foncé (meilleure satisfaction)
         smiley_selected = False
         max_attempts = 3
         
+        # Les radios ne sont relus que si la tentative précédente les a mis en doute
+        refresh = False
+        
         for attempt in range(max_attempts):
             try:
-                all_radios = driver.find_elements(By.XPATH, "//input[@type='radio']")
+                all_radios = get_radios(driver, timeout=TIMEOUTS['element_wait'], refresh=refresh)
+                refresh = False
                 
                 if all_radios and len(all_radios) >= 4:
-                    logger.info(f"📊 Tentative {attempt + 1}/{max_attempts}: {len(all_radios)} smileys trouvés")
+                    logger.info("📊 Tentative %s/%s: %s smileys trouvés", attempt + 1, max_attempts, len(all_radios))
                     
-                    # Analyser et trouver le meilleur smiley
-                    best_smiley = find_best_satisfaction_smiley(driver, all_radios)
+                    # Analyse, sélection et vérification en un seul appel JS
+                    selection = select_best_satisfaction_smiley(driver, all_radios)
                     
-                    if not best_smiley:
-                        logger.warning(f"⚠️ Aucun smiley trouvé à la tentative {attempt + 1}")
+                    if selection is None:
+                        logger.warning("⚠️ Aucun smiley trouvé à la tentative %s", attempt + 1)
                         wait_random(0.3, 0.6)  # Optimisé pour vitesse
+                        refresh = True
                         continue
                     
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", best_smiley)
-                    wait_random(0.5, 1)  # Optimisé pour vitesse
-                    
-                    parent_label = driver.execute_script("return arguments[0].closest('label') || arguments[0].parentElement;", best_smiley)
-                    if parent_label:
-                        driver.execute_script("arguments[0].click();", parent_label)
-                        wait_random(0.3, 0.6)  # Optimisé pour vitesse
-                    
-                    driver.execute_script("arguments[0].checked = true;", best_smiley)
-                    driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", best_smiley)
-                    driver.execute_script("arguments[0].dispatchEvent(new Event('click', { bubbles: true }));", best_smiley)
-                    wait_random(0.3, 0.6)  # Optimisé pour vitesse
-                    
-                    is_checked = driver.execute_script("return arguments[0].checked;", best_smiley)
-                    if is_checked:
+                    # Coche parfois appliquée en différé par le widget : on l'attend avant de resélectionner
+                    smiley, checked = selection
+                    if checked or wait_until_checked(driver, smiley, timeout=2):
                         logger.info("✅ Smiley vert foncé (meilleure satisfaction) CONFIRMÉ coché")
                         smiley_selected = True
                         break
                     else:
-                        logger.warning(f"⚠️ Tentative {attempt + 1} échouée, le smiley n'est pas coché")
-                        wait_random(0.5, 1)
+                        logger.warning("⚠️ Tentative %s échouée, le smiley n'est pas coché", attempt + 1)
                 else:
-                    logger.warning(f"⚠️ Pas assez de smileys trouvés: {len(all_radios)}")
+                    logger.warning("⚠️ Pas assez de smileys trouvés: %s", len(all_radios))
+                    refresh = True
                     
             except Exception as e:
-                logger.warning(f"⚠️ Erreur tentative {attempt + 1}: {e}")
+                logger.warning("⚠️ Erreur tentative %s: %s", attempt + 1, e)
                 wait_random(0.5, 1)
+                refresh = True
         
         if not smiley_selected:
             logger.error("❌ ÉCHEC: Impossible de sélectionner le smiley après 3 tentatives")
             return False
         
-        wait_random(0.8, 1.2)  # Optimisé pour vitesse
-        
         # 2. OBLIGATOIRE: Saisir le commentaire
         commentaire_saisi = False
         
         try:
-            selectors = [
-                "//textarea",
-                "//textarea[@placeholder]",
-                "//textarea[contains(@class, 'comment')]",
-                "//textarea[contains(@id, 'comment')]"
-            ]
-            
-            textarea = None
-            for selector in selectors:
-                try:
-                    textarea = driver.find_element(By.XPATH, selector)
-                    if textarea:
-                        logger.info(f"✅ Textarea trouvé avec: {selector}")
-                        break
-                except:
-                    continue
+            try:
+                textarea = wait_for_clickable(driver, LOC_TEXTAREA,
+                                              timeout=TIMEOUTS['element_wait'], min_pace=0.1, max_pace=0.3)
+                logger.info("✅ Textarea trouvé")
+            except TimeoutException:
+                textarea = None
             
             if not textarea:
                 logger.error("❌ ÉCHEC: Textarea non trouvé")
@@ -607,7 +612,7 @@ def step_5_satisfaction_comment(driver) -> bool:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", textarea)
             wait_random(0.5, 0.8)  # Optimisé pour vitesse
             
-            commentaire = pick_avis(session_data.get('current_category'))
+            commentaire = pick_avis(state.current_category, state)
             if not commentaire:
                 logger.error("❌ ÉCHEC: Aucun commentaire disponible")
                 return False
@@ -617,23 +622,29 @@ def step_5_satisfaction_comment(driver) -> bool:
             textarea.clear()
             wait_random(0.2, 0.3)  # Optimisé pour vitesse
             
-            logger.info(f"📝 Début de la saisie du commentaire: {commentaire[:50]}...")
-            human_typing(textarea, commentaire)
-            wait_random(0.6, 1)  # Optimisé pour vitesse
+            logger.info("📝 Début de la saisie du commentaire: %s...", commentaire[:50])
+            try:
+                # Un Input.insertText par segment au lieu d'un événement clavier par caractère
+                human_insert_text(driver, textarea, commentaire)
+            except Exception as e:
+                logger.warning("⚠️ Saisie CDP impossible, frappe clavier classique: %s", e)
+                textarea.clear()
+                human_typing(textarea, commentaire)
             
-            valeur_saisie = driver.execute_script("return arguments[0].value || arguments[0].textContent || arguments[0].innerHTML;", textarea)
-            logger.info(f"🔍 Vérification: valeur récupérée = '{valeur_saisie[:50] if valeur_saisie else 'VIDE'}...'")
+            # Lecture par valeur via CDP (seule une chaîne transite)
+            valeur_saisie = cdp_eval(driver, _TEXTAREA_VALUE_SCRIPT, LOC_TEXTAREA[1])
+            logger.info("🔍 Vérification: valeur récupérée = '%s...'", valeur_saisie[:50] if valeur_saisie else 'VIDE')
             
             if valeur_saisie and len(valeur_saisie.strip()) > 10:
-                logger.info(f"✅ Commentaire CONFIRMÉ saisi ({len(valeur_saisie)} caractères)")
+                logger.info("✅ Commentaire CONFIRMÉ saisi (%s caractères)", len(valeur_saisie))
                 commentaire_saisi = True
             else:
-                logger.error(f"❌ ÉCHEC: Commentaire non saisi correctement (longueur: {len(valeur_saisie) if valeur_saisie else 0})")
-                logger.error(f"❌ Contenu récupéré: '{valeur_saisie}'")
+                logger.error("❌ ÉCHEC: Commentaire non saisi correctement (longueur: %s)", len(valeur_saisie) if valeur_saisie else 0)
+                logger.error("❌ Contenu récupéré: '%s'", valeur_saisie)
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ ÉCHEC lors de la saisie du commentaire: {e}")
+            logger.error("❌ ÉCHEC lors de la saisie du commentaire: %s", e)
             return False
         
         if not commentaire_saisi:
@@ -641,178 +652,130 @@ def step_5_satisfaction_comment(driver) -> bool:
             return False
         
         # 3. Cliquer sur Suivant SEULEMENT si smiley ET commentaire OK
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        
         try:
-            next_button = driver.find_element(By.XPATH, "//button[contains(., 'Suivant')]")
+            next_button = wait_for_next_button(
+                driver, timeout=TIMEOUTS['click_wait'], min_pace=0.5, max_pace=1.0
+            )
             
-            is_disabled = driver.execute_script("return arguments[0].disabled || arguments[0].hasAttribute('disabled');", next_button)
-            if is_disabled:
-                logger.warning("⚠️ Le bouton Suivant est désactivé, attente supplémentaire...")
-                wait_random(1, 1.5)  # Optimisé pour vitesse
-                is_disabled = driver.execute_script("return arguments[0].disabled || arguments[0].hasAttribute('disabled');", next_button)
-                if is_disabled:
-                    logger.error("❌ Le bouton Suivant reste désactivé")
-                    return False
+            # Polling côté navigateur : rend la main dès que le bouton s'active
+            if not wait_until_enabled(driver, next_button, timeout=8):
+                logger.error("❌ Le bouton Suivant reste désactivé")
+                return False
             
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            wait_random(0.5, 0.8)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", next_button)
+            native_click(driver, next_button)
             logger.info("✅ Clic sur Suivant effectué")
             
         except Exception as btn_err:
-            logger.error(f"❌ Erreur lors du clic sur Suivant: {btn_err}")
+            logger.error("❌ Erreur lors du clic sur Suivant: %s", btn_err)
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=next_button)
         
     except Exception as e:
-        logger.error(f"❌ Étape 5 échouée: {str(e)}")
+        logger.error("❌ Étape 5 échouée: %s", e)
         return False
 
-def step_6_dimension_ratings(driver) -> bool:
+def step_6_dimension_ratings(driver, state: SurveyState) -> bool:
     """Étape 6: Notes sur chaque dimension (premier émoji vert foncé de chaque ligne)"""
     logger.info("⭐ Étape 6: Notes sur chaque dimension")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
         # Trouver tous les boutons radio (il y a 4 lignes avec 6 options chacune: 5 émojis + "Non concerné")
-        radios_dim = driver.find_elements(By.XPATH, "//input[@type='radio']")
+        radios_dim = get_radios(driver, timeout=TIMEOUTS['element_wait'])
+        
+        # Nombre d'options par ligne (normalement 6: 5 émojis + 1 "Non concerné")
+        # Il y a 4 lignes de questions
+        options_per_line = 6
+        nb_lines = 4
         
+        # Pour chaque ligne, le premier émoji (index 0, 6, 12, 18)
+        selected = []
         if radios_dim:
-            # Calculer le nombre d'options par ligne (normalement 6: 5 émojis + 1 "Non concerné")
-            # Il y a 4 lignes de questions
-            options_per_line = 6
-            nb_lines = 4
-            
-            logger.info(f"📊 Total de boutons radio trouvés: {len(radios_dim)}")
-            logger.info(f"📊 Nombre de lignes à traiter: {nb_lines}")
-            
-            # Pour chaque ligne, cliquer sur le premier émoji (index 0, 6, 12, 18)
-            for line_num in range(nb_lines):
-                index = line_num * options_per_line
-                
-                if index < len(radios_dim):
-                    # Faire défiler jusqu'à l'élément
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", radios_dim[index])
-                    wait_random(0.2, 0.4)  # Optimisé pour vitesse
-                    
-                    # Cliquer sur le premier émoji (vert foncé)
-                    driver.execute_script("arguments[0].click();", radios_dim[index])
-                    logger.info(f"✅ Ligne {line_num + 1}: Premier émoji vert foncé sélectionné (index {index})")
-                    wait_random(0.1, 0.3)  # Optimisé pour vitesse
+            logger.info("📊 Total de boutons radio trouvés: %s", len(radios_dim))
+            logger.info("📊 Nombre de lignes à traiter: %s", nb_lines)
             
-            logger.info("✅ Toutes les dimensions notées avec le meilleur score")
+            selected = radios_dim[:nb_lines * options_per_line:options_per_line]
         else:
             logger.warning("⚠️ Aucun bouton radio trouvé")
         
-        # Attendre que le bouton Suivant soit activé
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
-        # Chercher le bouton Suivant avec plusieurs sélecteurs possibles
-        next_button = None
-        selectors = [
-            "//button[contains(., 'Suivant')]",
-            "//button[contains(text(), 'Suivant')]",
-            "//button[@type='submit']",
-            "//input[@type='submit' and contains(@value, 'Suivant')]",
-            "//button[contains(@class, 'next')]",
-            "//button[contains(@class, 'submit')]"
-        ]
-        
-        for selector in selectors:
-            try:
-                next_button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                if next_button:
-                    logger.info(f"✅ Bouton Suivant trouvé avec le sélecteur: {selector}")
-                    break
-            except:
-                continue
-        
-        if not next_button:
+        # Tous les émojis + Suivant en un seul appel JS (repli : attente du bouton activé)
+        checked, clicked = select_radios_and_next(driver, selected, timeout=TIMEOUTS['element_wait'])
+        for line_num, is_checked in enumerate(checked):
+            if is_checked:
+                logger.info("✅ Ligne %s: Premier émoji vert foncé sélectionné (index %s)", line_num + 1, line_num * options_per_line)
+            else:
+                logger.warning("⚠️ Ligne %s: émoji non coché (index %s)", line_num + 1, line_num * options_per_line)
+        if selected:
+            logger.info("✅ Toutes les dimensions notées avec le meilleur score")
+        
+        if not clicked:
             logger.error("❌ Bouton Suivant introuvable avec tous les sélecteurs")
             return False
-        
-        # Faire défiler et cliquer
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-        wait_random(0.3, 0.6)  # Optimisé pour vitesse
-        driver.execute_script("arguments[0].click();", next_button)
         logger.info("✅ Bouton Suivant cliqué")
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=radios_dim[0] if radios_dim else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 6 échouée: {str(e)}")
+        logger.error("❌ Étape 6 échouée: %s", e)
         return False
 
-def step_7_order_accuracy(driver) -> bool:
+def step_7_order_accuracy(driver, state: SurveyState) -> bool:
     """Étape 7: Commande exacte (Oui = premier bouton)"""
     logger.info("✅ Étape 7: Commande exacte")
     try:
-        wait_random(1, 2)
-        
         # Cliquer sur le premier bouton (Oui)
-        radios_exact = driver.find_elements(By.XPATH, "//input[@type='radio']")
+        radios_exact = get_radios(driver, timeout=TIMEOUTS['element_wait'])
+        selected_radio = None
         if radios_exact:
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", radios_exact[0])
-            wait_random(0.3, 0.7)
-            driver.execute_script("arguments[0].click();", radios_exact[0])
+            selected_radio = radios_exact[0]
             logger.info("✅ 'Oui' sélectionné (commande exacte)")
         
-        # Cliquer sur Suivant (factorisé)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             return False
         
-        wait_random(1, 1.5)  # Optimisé pour vitesse
-        return True
+        # Attente de la page suivante (pas de délai fixe) : échec de l'étape si elle n'arrive pas
+        return wait_for_next_step(driver, LOC_RADIO, timeout=TIMEOUTS['element_wait'], previous=radios_exact[0] if radios_exact else None)
         
     except Exception as e:
-        logger.error(f"❌ Étape 7 échouée: {str(e)}")
+        logger.error("❌ Étape 7 échouée: %s", e)
         return False
 
-def step_8_problem_encountered(driver) -> bool:
+def step_8_problem_encountered(driver, state: SurveyState) -> bool:
     """Étape 8: Problème rencontré (Non = deuxième bouton)"""
     logger.info("❌ Étape 8: Problème rencontré")
     try:
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        
-        # Cliquer sur le deuxième bouton (Non) avec WebDriverWait pour robustesse
-        radios_prob = WebDriverWait(driver, TIMEOUTS['element_wait']).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//input[@type='radio']"))
-        )
+        # Cliquer sur le deuxième bouton (Non)
+        radios_prob = get_radios(driver, timeout=TIMEOUTS['element_wait'])
         if radios_prob and len(radios_prob) >= 2:
             selected_radio = radios_prob[1]
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", selected_radio)
-            wait_random(0.2, 0.4)  # Optimisé pour vitesse
-            driver.execute_script("arguments[0].click();", selected_radio)
-            # Validation que le radio est bien sélectionné
-            if not validate_radio_selected(driver, selected_radio):
-                logger.warning("⚠️ Validation du radio échouée, nouvelle tentative...")
-                driver.execute_script("arguments[0].checked = true;", selected_radio)
-                driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", selected_radio)
             logger.info("✅ 'Non' sélectionné (aucun problème)")
         else:
             logger.error("❌ Pas assez de boutons radio trouvés")
             return False
         
-        # Cliquer sur Suivant (utiliser la fonction factorisée pour plus de robustesse)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
-        if not click_next_button(driver, timeout=TIMEOUTS['element_wait']):
+        # Sélection + Suivant en un seul appel JS (repli : attente du bouton activé)
+        if not select_radio_and_next(driver, selected_radio, timeout=TIMEOUTS['element_wait']):
             logger.error("❌ Impossible de cliquer sur Suivant")
             return False
         
-        wait_random(1.5, 2.5)  # Optimisé pour vitesse
+        # Attente de la soumission (page de remerciement) au lieu d'un délai fixe
+        try:
+            get_wait(driver, TIMEOUTS['page_load']).until(EC.any_of(
+                EC.staleness_of(selected_radio),
+                EC.url_contains("merci"),
+            ))
+        except TimeoutException:
+            logger.warning("⚠️ Page de fin non détectée, soumission supposée effectuée")
+        
         logger.info("🎉 Questionnaire terminé !")
         return True
         
     except Exception as e:
-        logger.error(f"❌ Étape 8 échouée: {str(e)}")
-        logger.debug(f"Détails: {traceback.format_exc()}")
+        logger.error("❌ Étape 8 échouée: %s", e)
+        # Trace formatée par le handler, uniquement si le niveau DEBUG est actif
+        logger.debug("Détails:", exc_info=True)
         return False
 
 # ============================================================================
@@ -1,8 +1,12 @@
 import os
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Instantané de l'environnement (après .env) : lectures suivantes en simple accès dict
+_ENV = dict(os.environ)
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 AVIS_DIR = os.path.join(BASE_DIR, "AVIS")
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -10,33 +14,46 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 AVIS_FILE = os.path.join(AVIS_DIR, "avis_drive.txt")
 
 CHROME_OPTIONS = {
-    'languages': os.getenv('CHROME_LANGUAGES', 'fr-FR,fr').split(','),
-    'user_agent': os.getenv('CHROME_USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'),
-    'window_size': os.getenv('CHROME_WINDOW_SIZE', '1920,1080'),
-    'vendor': os.getenv('CHROME_VENDOR', 'Google Inc.'),
-    'platform': os.getenv('CHROME_PLATFORM', 'Win32'),
-    'webgl_vendor': os.getenv('CHROME_WEBGL_VENDOR', 'Intel Inc.'),
-    'renderer': os.getenv('CHROME_RENDERER', 'Intel Iris OpenGL Engine'),
+    'languages': _ENV.get('CHROME_LANGUAGES', 'fr-FR,fr').split(','),
+    'user_agent': _ENV.get('CHROME_USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'),
+    'window_size': _ENV.get('CHROME_WINDOW_SIZE', '1920,1080'),
+    'vendor': _ENV.get('CHROME_VENDOR', 'Google Inc.'),
+    'platform': _ENV.get('CHROME_PLATFORM', 'Win32'),
+    'webgl_vendor': _ENV.get('CHROME_WEBGL_VENDOR', 'Intel Inc.'),
+    'renderer': _ENV.get('CHROME_RENDERER', 'Intel Iris OpenGL Engine'),
+    # --disable-dev-shm-usage (uniquement si /dev/shm < 2 Go, ex: Docker sans --shm-size=2g)
+    'shm_workaround': _ENV.get('CHROME_SHM_WORKAROUND', 'false').lower() == 'true',
+    # Blocage des images/polices/analytics (le bot ne lit que les attributs du DOM)
+    'block_resources': _ENV.get('CHROME_BLOCK_RESOURCES', 'true').lower() == 'true',
+    # Navigateur sans fenêtre (lots en processus parallèles)
+    'headless': _ENV.get('CHROME_HEADLESS', 'false').lower() == 'true',
 }
 
-TIMING = {
-    'short_wait': (int(os.getenv('TIMING_SHORT_WAIT_MIN', '1')), int(os.getenv('TIMING_SHORT_WAIT_MAX', '3'))),
-    'medium_wait': (int(os.getenv('TIMING_MEDIUM_WAIT_MIN', '3')), int(os.getenv('TIMING_MEDIUM_WAIT_MAX', '7'))),
-    'long_wait': (int(os.getenv('TIMING_LONG_WAIT_MIN', '5')), int(os.getenv('TIMING_LONG_WAIT_MAX', '10'))),
-    'min_total_duration': int(os.getenv('TIMING_MIN_TOTAL_DURATION', '60')),
-}
+# Taille de fenêtre parsée une seule fois (largeur, hauteur)
+CHROME_OPTIONS['window_size_wh'] = tuple(int(x) for x in CHROME_OPTIONS['window_size'].split(','))
+CHROME_OPTIONS = MappingProxyType(CHROME_OPTIONS)
+
+TIMING = MappingProxyType({
+    'short_wait': (int(_ENV.get('TIMING_SHORT_WAIT_MIN', '1')), int(_ENV.get('TIMING_SHORT_WAIT_MAX', '3'))),
+    'medium_wait': (int(_ENV.get('TIMING_MEDIUM_WAIT_MIN', '3')), int(_ENV.get('TIMING_MEDIUM_WAIT_MAX', '7'))),
+    'long_wait': (int(_ENV.get('TIMING_LONG_WAIT_MIN', '5')), int(_ENV.get('TIMING_LONG_WAIT_MAX', '10'))),
+    'min_total_duration': int(_ENV.get('TIMING_MIN_TOTAL_DURATION', '60')),
+})
 
 # Timeouts centralisés (en secondes)
-TIMEOUTS = {
-    'element_wait': int(os.getenv('TIMEOUT_ELEMENT_WAIT', '10')),  # Attente pour trouver un élément
-    'page_load': int(os.getenv('TIMEOUT_PAGE_LOAD', '30')),  # Chargement de page
-    'click_wait': int(os.getenv('TIMEOUT_CLICK_WAIT', '5')),  # Attente après un clic
-    'retry_delay': int(os.getenv('TIMEOUT_RETRY_DELAY', '2')),  # Délai entre retries
-    'max_retries': int(os.getenv('MAX_RETRIES', '3')),  # Nombre max de tentatives
-}
+TIMEOUTS = MappingProxyType({
+    'element_wait': int(_ENV.get('TIMEOUT_ELEMENT_WAIT', '10')),  # Attente pour trouver un élément
+    'page_load': int(_ENV.get('TIMEOUT_PAGE_LOAD', '30')),  # Chargement de page
+    'click_wait': int(_ENV.get('TIMEOUT_CLICK_WAIT', '5')),  # Attente après un clic
+    'retry_delay': int(_ENV.get('TIMEOUT_RETRY_DELAY', '2')),  # Délai entre retries
+    'max_retries': int(_ENV.get('MAX_RETRIES', '3')),  # Nombre max de tentatives
+})
+
+# Connexions HTTP simultanées vers chromedriver (urllib3 n'en garde qu'une par défaut)
+WEBDRIVER_POOL_SIZE = int(_ENV.get('WEBDRIVER_POOL_SIZE', '10'))
 
 # XPath des éléments importants
-XPATHS = {
+XPATHS = MappingProxyType({
     'start_button': "//button[contains(., 'Commencer') or contains(., 'Start')]",
     'next_button': "//button[contains(., 'Suivant') or contains(., 'Next')]",
     'radio_input': "input[type='radio']",
@@ -44,10 +61,33 @@ XPATHS = {
     'date_input': "//input[@type='date' or @placeholder='JJ/MM/AAAA']",
     'time_inputs': "//input[contains(@placeholder, 'HH') or contains(@placeholder, 'MM')]",
     'restaurant_input': "//input[contains(@placeholder, 'restaurant') or contains(@placeholder, 'code')]"
-}
+})
 
-# Mapping des fichiers d'avis
-AVIS_MAPPING = {
+# Union XPath des variantes du bouton "Suivant" (une seule attente au lieu d'une par variante) ;
+# repli de CSS_SELECTORS['next_button'] pour les boutons repérés par leur texte
+NEXT_BUTTON_UNION_XPATH = " | ".join([
+    "//button[contains(., 'Suivant')]",
+    "//button[contains(., 'Next')]",
+    "//button[@type='submit']",
+    "//input[@type='submit' and contains(@value, 'Suivant')]",
+    "//button[contains(@class, 'next')]",
+    "//button[contains(@class, 'submit')]",
+])
+
+# Sélecteurs CSS équivalents (le moteur CSS de Blink est bien plus rapide que son moteur XPath)
+CSS_SELECTORS = MappingProxyType({
+    'radio_input': "input[type='radio']",
+    'textarea': "textarea",
+    'date_input': "input[placeholder='JJ/MM/AAAA']",
+    'time_inputs': "input[maxlength='2'][type='text']",
+    'restaurant_input': "input[maxlength='4'][type='text']",
+    # Variantes sans texte du bouton "Suivant" (le texte reste dans NEXT_BUTTON_UNION_XPATH)
+    'next_button': "button[type='submit'], input[type='submit'][value*='Suivant'], "
+                   "button[class*='next'], button[class*='submit']",
+})
+
+# Mapping des fichiers d'avis (lecture seule : partagé entre les questionnaires en parallèle)
+AVIS_MAPPING = MappingProxyType({
     'borne_sur_place': os.path.join(AVIS_DIR, "avis_borne_sur_place.txt"),
     'borne_emporter': os.path.join(AVIS_DIR, "avis_borne_a_emporter.txt"),
     'comptoir_sur_place': os.path.join(AVIS_DIR, "avis_comptoir_sur_place.txt"),
@@ -62,35 +102,35 @@ AVIS_MAPPING = {
     'cc_site_exterieur': os.path.join(AVIS_DIR, "avis_cc_site_exterieur.txt"),
     'cc_site_guichet': os.path.join(AVIS_DIR, "avis_cc_site_guichet.txt"),
     'cc_site_guichet_vente': os.path.join(AVIS_DIR, "avis_cc_site_guichet_vente.txt")
-}
+})
 
-# Mapping des types de service
-SERVICE_TYPE_MAPPING = {
-    0: {
+# Mapping des types de service (lecture seule, comme AVIS_MAPPING)
+SERVICE_TYPE_MAPPING = MappingProxyType({
+    0: MappingProxyType({
         "sur_place": "borne_sur_place",
         "emporter": "borne_emporter"
-    },
-    1: {
+    }),
+    1: MappingProxyType({
         "sur_place": "comptoir_sur_place",
         "emporter": "comptoir_emporter"
-    },
-    2: {
+    }),
+    2: MappingProxyType({
         "default": "drive"
-    },
-    3: {
+    }),
+    3: MappingProxyType({
         "comptoir": "cc_appli_comptoir",
         "drive": "cc_appli_drive",
         "guichet": "cc_appli_guichet",
         "exterieur": "cc_appli_exterieur"
-    },
-    4: {
+    }),
+    4: MappingProxyType({
         "comptoir": "cc_site_comptoir",
         "drive": "cc_site_drive",
         "guichet": "cc_site_guichet",
         "exterieur": "cc_site_exterieur"
-    }
-}
+    })
+})
 
-RESTAURANT_NUMBER = os.getenv('RESTAURANT_NUMBER', '1435')
+RESTAURANT_NUMBER = _ENV.get('RESTAURANT_NUMBER', '1435')
 
-SURVEY_URL = os.getenv('SURVEY_URL', 'https://survey2.medallia.eu/?hellomcdo')
+SURVEY_URL = _ENV.get('SURVEY_URL', 'https://survey2.medallia.eu/?hellomcdo')
@@ -2,10 +2,18 @@
 # -*- coding: utf-8 -*-
 """Chargeur de configuration YAML."""
 
+import os
+import pickle
 import yaml
 from pathlib import Path
 from typing import Dict, Any
 
+# Parseur C (libyaml) quand il est disponible, sinon le SafeLoader pur Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ConfigLoader:
     """Charge et gère la configuration depuis le fichier YAML."""
@@ -14,14 +22,37 @@ class ConfigLoader:
         """Initialise le chargeur de configuration."""
         self.base_dir = Path(__file__).parent.parent
         self.config_file = self.base_dir / config_file
+        self.snapshot_file = self.config_file.with_name(self.config_file.name + '.pickle')
         self._config = None
+        self._flat: Dict[str, Any] = {}
+        self._timings: Dict[str, tuple] = {}
     
     def load(self) -> Dict[str, Any]:
         """Charge la configuration depuis le fichier YAML."""
         if self._config is None:
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self._config = yaml.safe_load(f)
+                # Identité du YAML relevée avant lecture : une modification pendant le parsing
+                # invalide l'instantané au prochain démarrage
+                stat = self.config_file.stat()
+                source = (stat.st_mtime_ns, stat.st_size)
+                self._config = self._read_snapshot(source)
+                if self._config is None:
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        # Fichier vide : yaml renvoie None, traité comme une configuration vide
+                        self._config = yaml.load(f, Loader=_YamlLoader) or {}
+                    self._write_snapshot(self._config, source)
+                
+                # Taille de fenêtre parsée une seule fois (largeur, hauteur)
+                chrome = self._config.get('chrome') or {}
+                if 'window_size' in chrome:
+                    chrome['window_size_wh'] = tuple(int(x) for x in str(chrome['window_size']).split(','))
+                
+                # Index plat des clés pointées ('timing.page_load' -> valeur) : get() = un accès dict
+                self._flat = {}
+                self._flatten(self._config)
+                self._timings = {
+                    key: tuple(value) for key, value in (self._config.get('timing') or {}).items()
+                }
             except FileNotFoundError:
                 raise FileNotFoundError(f"Fichier de configuration introuvable: {self.config_file}")
             except yaml.YAMLError as e:
@@ -29,19 +60,48 @@ class ConfigLoader:
         
         return self._config
     
+    def _flatten(self, node: Dict[str, Any], prefix: str = '') -> None:
+        """Enregistre chaque chemin pointé (nœuds intermédiaires compris) dans self._flat."""
+        for k, v in node.items():
+            path = f"{prefix}{k}"
+            self._flat[path] = v
+            if isinstance(v, dict):
+                self._flatten(v, path + '.')
+    
+    def _read_snapshot(self, source: tuple):
+        """
+        Relit la configuration déjà parsée si l'instantané a été pris sur ce même YAML.
+        
+        source = (st_mtime_ns, st_size) du YAML : une égalité exacte est exigée, un fichier
+        restauré avec une date plus ancienne (cp -p, archive) invalide donc aussi l'instantané.
+        """
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            # Absent, tronqué ou d'un ancien format : on reparse le YAML
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('source') != source:
+            return None
+        return snapshot.get('config')
+    
+    def _write_snapshot(self, data: Dict[str, Any], source: tuple) -> None:
+        """Enregistre la configuration parsée (les démarrages suivants évitent le parsing YAML)."""
+        # Fichier temporaire propre au processus : les workers des lots chargent aussi la configuration
+        tmp_path = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'source': source, 'config': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_file)
+        except OSError:
+            # Dossier en lecture seule : on reparsera le YAML au prochain démarrage
+            pass
+    
     def get(self, key: str, default=None) -> Any:
         """Récupère une valeur de configuration."""
-        config = self.load()
-        keys = key.split('.')
-        value = config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        if self._config is None:
+            self.load()
+        return self._flat.get(key, default)
     
     def get_chrome_options(self) -> Dict[str, Any]:
         """Récupère les options Chrome."""
@@ -49,8 +109,13 @@ class ConfigLoader:
     
     def get_timing(self, key: str) -> tuple:
         """Récupère un timing (min, max)."""
-        timing = self.get(f'timing.{key}', [1, 2])
-        return tuple(timing)
+        if self._config is None:
+            self.load()
+        return self._timings.get(key, (1, 2))
+    
+    def get_batch_workers(self) -> int:
+        """Nombre de navigateurs simultanés des lots (défaut: moitié des CPU)."""
+        return self.get('batch.max_workers') or max(1, (os.cpu_count() or 2) // 2)
     
     def get_avis_mapping(self) -> Dict[str, str]:
         """Récupère le mapping des fichiers d'avis."""
@@ -2,16 +2,30 @@
 # -*- coding: utf-8 -*-
 """Planificateur intelligent pour les questionnaires."""
 
+import atexit
+import os
 import random
 import logging
 import json
+import time as _time
+from collections import deque
 from pathlib import Path
 from datetime import datetime, time, timedelta
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def _seconds_of_day(t) -> int:
+    """Convertit une heure (time ou datetime) en secondes depuis minuit."""
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _format_seconds_of_day(seconds: int) -> str:
+    """Formate des secondes depuis minuit en HH:MM:SS (affichage uniquement)."""
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
 class QuestionnaireScheduler:
     """Gère la planification des questionnaires selon les horaires de l'établissement."""
     
@@ -30,10 +44,26 @@ class QuestionnaireScheduler:
     BOT_START_TIME = time(11, 30)       # Jamais avant 11h30
     BOT_END_TIME = time(21, 38)         # Jamais après 21h38
     DAILY_QUESTIONNAIRES = 6            # 6 questionnaires par jour
+    SAVE_INTERVAL = 5.0                 # Écritures regroupées (secondes) hors compteur
+    SLOT_JITTER_MINUTES = 30            # Variation autour de chaque créneau du jour
+    MIN_GAP_MINUTES = 70                # Écart minimal après chaque tentative, réussie ou non
+    
+    # Bornes précalculées en secondes depuis minuit : les contrôles sont de simples comparaisons
+    # d'entiers, les objets time ne servent plus qu'à l'affichage
+    _BOT_START_S = _seconds_of_day(BOT_START_TIME)
+    _BOT_END_S = _seconds_of_day(BOT_END_TIME)
+    _OPENING_S = tuple(
+        (_seconds_of_day(opening), _seconds_of_day(closing))
+        for _, (opening, closing) in sorted(OPENING_HOURS.items())
+    )
     
     def __init__(self):
         self.data_file = Path(__file__).parent.parent / "scheduler_data.json"
+        self._dirty = False
+        self._last_save = 0.0
+        self._status_cache = None  # (clé, statut) : voir get_status
         self._load_data()
+        atexit.register(self._flush)
     
     def _load_data(self):
         """Charge les données depuis le fichier JSON."""
@@ -48,81 +78,150 @@ class QuestionnaireScheduler:
                     else:
                         self.last_reset_date = datetime.now().date()
                     
-                    self.completed_times = data.get('completed_times', [])
+                    # Secondes depuis minuit ; les anciens fichiers stockaient des chaînes HH:MM:SS
+                    self.completed_times = deque(
+                        (v if isinstance(v, int) else _seconds_of_day(time.fromisoformat(v))
+                         for v in data.get('completed_times', [])),
+                        maxlen=self.DAILY_QUESTIONNAIRES
+                    )
                     self.next_scheduled_time = data.get('next_scheduled_time')
+                    self.scheduled_times = data.get('scheduled_times', []) if self.last_reset_date == datetime.now().date() else []
+                    self.last_attempt = data.get('last_attempt')
                     
-                    logger.info(f"📂 Données chargées: {self.today_count} questionnaires aujourd'hui ({self.last_reset_date})")
+                    logger.info("📂 Données chargées: %s questionnaires aujourd'hui (%s)", self.today_count, self.last_reset_date)
                     if self.completed_times:
-                        logger.info(f"📅 Horaires effectués: {', '.join(self.completed_times)}")
+                        logger.info("📅 Horaires effectués: %s", ', '.join(map(_format_seconds_of_day, self.completed_times)))
                     if self.next_scheduled_time:
-                        logger.info(f"⏰ Prochain horaire planifié: {self.next_scheduled_time}")
+                        logger.info("⏰ Prochain horaire planifié: %s", self.next_scheduled_time)
             except Exception as e:
-                logger.warning(f"⚠️ Erreur lors du chargement des données: {e}")
+                logger.warning("⚠️ Erreur lors du chargement des données: %s", e)
                 self.today_count = 0
                 self.last_reset_date = datetime.now().date()
-                self.completed_times = []
+                self.completed_times = deque(maxlen=self.DAILY_QUESTIONNAIRES)
                 self.next_scheduled_time = None
+                self.scheduled_times = []
+                self.last_attempt = None
         else:
             self.today_count = 0
             self.last_reset_date = datetime.now().date()
-            self.completed_times = []
+            self.completed_times = deque(maxlen=self.DAILY_QUESTIONNAIRES)
             self.next_scheduled_time = None
+            self.scheduled_times = []
+            self.last_attempt = None
             logger.info("📂 Nouveau fichier de données créé")
     
-    def _save_data(self):
-        """Sauvegarde les données dans le fichier JSON."""
+    def _save_data(self, force: bool = False):
+        """
+        Sauvegarde les données dans le fichier JSON.
+        
+        Les écritures rapprochées (moins de SAVE_INTERVAL secondes) sont différées et
+        regroupées ; force=True écrit immédiatement (compteur du jour).
+        """
+        self._dirty = True
+        if force or _time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self._flush()
+    
+    def _flush(self):
+        """Écrit les données en attente (écriture atomique : fichier temporaire puis os.replace)."""
+        if not self._dirty:
+            return
         try:
             data = {
                 'today_count': self.today_count,
                 'last_reset_date': self.last_reset_date.strftime('%Y-%m-%d'),
-                'completed_times': self.completed_times,
+                'completed_times': list(self.completed_times),
                 'next_scheduled_time': self.next_scheduled_time,
+                'scheduled_times': self.scheduled_times,
+                'last_attempt': self.last_attempt,
                 'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
+            tmp_path = self.data_file.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.debug(f"💾 Données sauvegardées: {self.today_count} questionnaires")
+            os.replace(tmp_path, self.data_file)
+            self._dirty = False
+            self._last_save = _time.monotonic()
+            logger.debug("💾 Données sauvegardées: %s questionnaires", self.today_count)
         except Exception as e:
-            logger.error(f"❌ Erreur lors de la sauvegarde des données: {e}")
+            logger.error("❌ Erreur lors de la sauvegarde des données: %s", e)
     
-    def _reset_if_new_day(self):
+    def _reset_if_new_day(self, now: Optional[datetime] = None):
         """Réinitialise le compteur si on est un nouveau jour."""
-        current_date = datetime.now().date()
+        current_date = (now or datetime.now()).date()
         if current_date != self.last_reset_date:
             self.today_count = 0
             self.last_reset_date = current_date
-            self.completed_times = []
+            self.completed_times = deque(maxlen=self.DAILY_QUESTIONNAIRES)
             self.next_scheduled_time = None
+            self.scheduled_times = []
             self._save_data()
-            logger.info(f"📅 Nouveau jour détecté - Compteur et horaires réinitialisés")
+            logger.info("📅 Nouveau jour détecté - Compteur et horaires réinitialisés")
     
-    def can_run_questionnaire(self) -> Tuple[bool, str]:
+    def _plan_day(self, start_min: Optional[int] = None) -> List[str]:
+        """
+        Tire en une fois les créneaux du jour (HH:MM), centrés sur des intervalles égaux de la plage du bot.
+        
+        Chaque créneau varie de ±SLOT_JITTER_MINUTES ; le planning est sauvegardé avec l'état,
+        il reste donc identique après un redémarrage dans la journée.
+        
+        Args:
+            start_min: Si fourni (minutes depuis minuit), seuls les créneaux restants (à partir de
+                today_count) sont re-tirés entre start_min et la fin de plage ; les autres sont conservés
+        """
+        end_min = self._BOT_END_S // 60
+        if start_min is None:
+            start_min = self._BOT_START_S // 60
+            kept = []
+        else:
+            kept = self.scheduled_times[:self.today_count]
+        count = self.DAILY_QUESTIONNAIRES - len(kept)
+        interval = (end_min - start_min) / count
+        jitter = self.SLOT_JITTER_MINUTES
+        
+        slots = sorted(
+            min(end_min, max(start_min, round(start_min + (i + 0.5) * interval + random.uniform(-jitter, jitter))))
+            for i in range(count)
+        )
+        self.scheduled_times = kept + [f"{m // 60:02d}:{m % 60:02d}" for m in slots]
+        self._save_data()
+        logger.info("🗓️ Créneaux du jour: %s", ', '.join(self.scheduled_times))
+        return self.scheduled_times
+    
+    def can_run_questionnaire(self, now: Optional[datetime] = None) -> Tuple[bool, str]:
         """
         Vérifie si un questionnaire peut être exécuté maintenant.
         
+        Args:
+            now: Instant de référence (défaut: datetime.now()), partagé par tous les contrôles
+        
         Returns:
             (bool, str): (peut_executer, raison)
         """
-        self._reset_if_new_day()
+        now = now or datetime.now()
+        self._reset_if_new_day(now)
         
-        now = datetime.now()
-        current_time = now.time()
-        current_weekday = now.weekday()
-        
-        # Vérifier si on a atteint le quota journalier
+        # Vérifier si on a atteint le quota journalier (cas de refus le plus fréquent en fin de journée)
         if self.today_count >= self.DAILY_QUESTIONNAIRES:
             return False, f"Quota journalier atteint ({self.DAILY_QUESTIONNAIRES} questionnaires)"
         
+        # Respecter l'écart minimal depuis la dernière tentative (y compris après un échec ou un redémarrage)
+        earliest = self._earliest_after_attempt()
+        if earliest and now < earliest:
+            return False, f"Dernière tentative trop récente - Prochain essai possible à {earliest.strftime('%H:%M')}"
+        
         # Vérifier si on est dans la plage horaire du bot (11h30 - 21h38)
-        if current_time < self.BOT_START_TIME:
+        current_s = _seconds_of_day(now)
+        if current_s < self._BOT_START_S:
             return False, f"Trop tôt - Le bot ne démarre qu'à {self.BOT_START_TIME.strftime('%H:%M')}"
         
-        if current_time > self.BOT_END_TIME:
+        if current_s > self._BOT_END_S:
             return False, f"Trop tard - Le bot s'arrête à {self.BOT_END_TIME.strftime('%H:%M')}"
         
         # Vérifier si le restaurant est ouvert
-        opening, closing = self.OPENING_HOURS[current_weekday]
-        if current_time < opening or current_time > closing:
+        weekday = now.weekday()
+        opening_s, closing_s = self._OPENING_S[weekday]
+        if not opening_s <= current_s <= closing_s:
+            opening, closing = self.OPENING_HOURS[weekday]
             return False, f"Restaurant fermé (ouvert de {opening.strftime('%H:%M')} à {closing.strftime('%H:%M')})"
         
         return True, "OK"
@@ -140,7 +239,6 @@ class QuestionnaireScheduler:
             Optional[Tuple[str, str, str]]: (date, heure, minute) ou None si impossible
         """
         now = datetime.now()
-        current_time = now.time()
         
         # L'heure maximale est maintenant
         max_time = now
@@ -167,7 +265,8 @@ class QuestionnaireScheduler:
             visit_time = now
         else:
             # Choisir un nombre aléatoire de minutes entre 0 et la différence
-            random_minutes = random.randint(0, int(time_diff_minutes))
+            # (tirage flottant tronqué : biais négligeable pour au plus 60 valeurs, sans la boucle de randint)
+            random_minutes = int(random.random() * (int(time_diff_minutes) + 1))
             visit_time = min_time + timedelta(minutes=random_minutes)
         
         # Formater pour le questionnaire
@@ -175,83 +274,106 @@ class QuestionnaireScheduler:
         hour_str = visit_time.strftime("%H")
         minute_str = visit_time.strftime("%M")
         
-        logger.info(f"🕐 Heure de visite générée: {visit_time.strftime('%d/%m/%Y à %H:%M')}")
-        logger.info(f"   (Maintenant: {now.strftime('%H:%M')}, Plage: {min_time.strftime('%H:%M')} - {max_time.strftime('%H:%M')})")
+        logger.info("🕐 Heure de visite générée: %s", visit_time.strftime('%d/%m/%Y à %H:%M'))
+        logger.info("   (Maintenant: %s, Plage: %s - %s)", now.strftime('%H:%M'), min_time.strftime('%H:%M'), max_time.strftime('%H:%M'))
         
         return date_str, hour_str, minute_str
     
-    def calculate_next_run_time(self) -> Optional[datetime]:
+    def _earliest_after_attempt(self) -> Optional[datetime]:
+        """Retourne le premier instant autorisé après la dernière tentative (None si aucune)."""
+        if not self.last_attempt:
+            return None
+        try:
+            last = datetime.strptime(self.last_attempt, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return None
+        return last + timedelta(minutes=self.MIN_GAP_MINUTES)
+    
+    def calculate_next_run_time(self, now: Optional[datetime] = None, replan: bool = True) -> Optional[datetime]:
         """
         Calcule le prochain moment où un questionnaire peut être exécuté.
         
+        Args:
+            now: Instant de référence (défaut: datetime.now())
+            replan: Si False, le planning du jour n'est ni tiré ni re-tiré (lecture seule, pour le statut) :
+                un créneau manquant ou dépassé donne simplement le premier instant autorisé
+        
         Returns:
             Optional[datetime]: Prochain moment d'exécution ou None si plus possible aujourd'hui
         """
-        self._reset_if_new_day()
+        now = now or datetime.now()
+        self._reset_if_new_day(now)
         
-        now = datetime.now()
-        current_time = now.time()
+        current_s = _seconds_of_day(now)
         
         # Si quota atteint, attendre demain
         if self.today_count >= self.DAILY_QUESTIONNAIRES:
             tomorrow = now + timedelta(days=1)
             next_run = datetime.combine(tomorrow.date(), self.BOT_START_TIME)
-            logger.info(f"📅 Quota atteint - Prochain run: {next_run.strftime('%d/%m/%Y à %H:%M')}")
+            logger.info("📅 Quota atteint - Prochain run: %s", next_run.strftime('%d/%m/%Y à %H:%M'))
             return next_run
         
         # Si trop tôt, attendre 11h30
-        if current_time < self.BOT_START_TIME:
+        if current_s < self._BOT_START_S:
             next_run = datetime.combine(now.date(), self.BOT_START_TIME)
-            logger.info(f"⏰ Trop tôt - Prochain run: {next_run.strftime('%H:%M')}")
+            logger.info("⏰ Trop tôt - Prochain run: %s", next_run.strftime('%H:%M'))
             return next_run
         
         # Si trop tard, attendre demain 11h30
-        if current_time > self.BOT_END_TIME:
+        if current_s > self._BOT_END_S:
             tomorrow = now + timedelta(days=1)
             next_run = datetime.combine(tomorrow.date(), self.BOT_START_TIME)
-            logger.info(f"🌙 Trop tard - Prochain run: {next_run.strftime('%d/%m/%Y à %H:%M')}")
+            logger.info("🌙 Trop tard - Prochain run: %s", next_run.strftime('%d/%m/%Y à %H:%M'))
             return next_run
         
-        # Sinon, calculer un délai aléatoire entre les questionnaires
-        # Répartir les 6 questionnaires sur la journée (11h30 - 21h38)
-        total_minutes = (datetime.combine(now.date(), self.BOT_END_TIME) - 
-                        datetime.combine(now.date(), self.BOT_START_TIME)).total_seconds() / 60
-        
-        remaining_questionnaires = self.DAILY_QUESTIONNAIRES - self.today_count
-        
-        if remaining_questionnaires > 0:
-            # Calculer un intervalle moyen
-            avg_interval = total_minutes / self.DAILY_QUESTIONNAIRES
-            
-            # Ajouter de la variation (±30%)
-            min_interval = int(avg_interval * 0.7)
-            max_interval = int(avg_interval * 1.3)
-            
-            # Délai aléatoire entre 5 minutes et l'intervalle calculé
-            delay_minutes = random.randint(max(5, min_interval), max_interval)
-            
-            next_run = now + timedelta(minutes=delay_minutes)
-            
-            # Vérifier qu'on ne dépasse pas 21h38
-            if next_run.time() > self.BOT_END_TIME:
-                next_run = datetime.combine(now.date(), self.BOT_END_TIME)
-            
-            logger.info(f"⏱️ Prochain questionnaire dans {delay_minutes} minutes ({next_run.strftime('%H:%M')})")
+        # Jamais avant l'écart minimal depuis la dernière tentative, réussie ou non
+        earliest = max(now, self._earliest_after_attempt() or now)
+        if earliest.date() != now.date() or _seconds_of_day(earliest) > self._BOT_END_S:
+            tomorrow = now + timedelta(days=1)
+            next_run = datetime.combine(tomorrow.date(), self.BOT_START_TIME)
+            logger.info("🌙 Plus de créneau possible aujourd'hui - Prochain run: %s", next_run.strftime('%d/%m/%Y à %H:%M'))
             return next_run
         
-        return None
+        # Sinon, prendre le créneau tiré pour ce questionnaire (planning du jour calculé une fois)
+        slots = self.scheduled_times or (self._plan_day() if replan else None)
+        if slots:
+            hour, minute = map(int, slots[self.today_count].split(':'))
+            next_run = datetime.combine(now.date(), time(hour, minute))
+        else:
+            next_run = earliest
+        
+        # Créneau déjà passé (échec, retard ou démarrage tardif) : les créneaux restants sont
+        # re-tirés à partir de l'instant autorisé au lieu d'être enchaînés ; un créneau tombant
+        # dans la minute même de cet instant est conservé tel quel
+        if replan and next_run < earliest.replace(second=0, microsecond=0):
+            slots = self._plan_day(start_min=_seconds_of_day(earliest) // 60)
+            hour, minute = map(int, slots[self.today_count].split(':'))
+            next_run = datetime.combine(now.date(), time(hour, minute))
+        
+        # Les créneaux sont à la minute : jamais avant l'instant autorisé (ni avant maintenant)
+        next_run = max(next_run, earliest)
+        
+        logger.info("⏱️ Prochain questionnaire à %s (créneau %s/%s)", next_run.strftime('%H:%M'), self.today_count + 1, self.DAILY_QUESTIONNAIRES)
+        return next_run
     
     def increment_count(self):
         """Incrémente le compteur de questionnaires du jour."""
-        self._reset_if_new_day()
+        now = datetime.now()
+        self._reset_if_new_day(now)
         self.today_count += 1
         
-        current_time = datetime.now().strftime('%H:%M:%S')
-        self.completed_times.append(current_time)
+        current_time = now.strftime('%H:%M:%S')
+        self.completed_times.append(_seconds_of_day(now))
         
-        self._save_data()
-        logger.info(f"📊 Questionnaires aujourd'hui: {self.today_count}/{self.DAILY_QUESTIONNAIRES}")
-        logger.info(f"⏰ Questionnaire effectué à: {current_time}")
+        # Le quota ne doit jamais être perdu : écriture immédiate
+        self._save_data(force=True)
+        logger.info("📊 Questionnaires aujourd'hui: %s/%s", self.today_count, self.DAILY_QUESTIONNAIRES)
+        logger.info("⏰ Questionnaire effectué à: %s", current_time)
+    
+    def record_attempt(self, now: Optional[datetime] = None):
+        """Enregistre le début d'une tentative (réussie ou non) pour imposer l'écart minimal."""
+        self.last_attempt = (now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        self._save_data(force=True)
     
     def set_next_scheduled_time(self, next_time: Optional[datetime]):
         """Enregistre le prochain horaire planifié."""
@@ -261,26 +383,35 @@ class QuestionnaireScheduler:
             self.next_scheduled_time = None
         self._save_data()
         if self.next_scheduled_time:
-            logger.info(f"📅 Prochain horaire enregistré: {self.next_scheduled_time}")
+            logger.info("📅 Prochain horaire enregistré: %s", self.next_scheduled_time)
     
     def get_status(self) -> dict:
-        """Retourne le statut actuel du planificateur."""
-        self._reset_if_new_day()
+        """
+        Retourne le statut actuel du planificateur.
         
+        Le statut est recalculé au plus une fois par minute tant que le compteur, la dernière
+        tentative et le planning ne changent pas (la GUI l'interroge en boucle) ; seule l'heure
+        courante est rafraîchie à chaque appel. La lecture du statut ne tire jamais de planning.
+        """
         now = datetime.now()
-        can_run, reason = self.can_run_questionnaire()
-        next_run = self.calculate_next_run_time()
-        
-        return {
-            'current_time': now.strftime('%H:%M:%S'),
-            'today_count': self.today_count,
-            'daily_limit': self.DAILY_QUESTIONNAIRES,
-            'remaining': self.DAILY_QUESTIONNAIRES - self.today_count,
-            'can_run': can_run,
-            'reason': reason,
-            'next_run': next_run.strftime('%d/%m/%Y à %H:%M') if next_run else 'N/A',
-            'bot_hours': f"{self.BOT_START_TIME.strftime('%H:%M')} - {self.BOT_END_TIME.strftime('%H:%M')}"
-        }
+        self._reset_if_new_day(now)
+        
+        key = (self.today_count, self.last_reset_date, self.last_attempt, tuple(self.scheduled_times),
+               now.replace(second=0, microsecond=0))
+        if self._status_cache is None or self._status_cache[0] != key:
+            can_run, reason = self.can_run_questionnaire(now)
+            next_run = self.calculate_next_run_time(now, replan=False)
+            self._status_cache = (key, {
+                'today_count': self.today_count,
+                'daily_limit': self.DAILY_QUESTIONNAIRES,
+                'remaining': self.DAILY_QUESTIONNAIRES - self.today_count,
+                'can_run': can_run,
+                'reason': reason,
+                'next_run': next_run.strftime('%d/%m/%Y à %H:%M') if next_run else 'N/A',
+                'bot_hours': f"{self.BOT_START_TIME.strftime('%H:%M')} - {self.BOT_END_TIME.strftime('%H:%M')}"
+            })
+        
+        return {'current_time': now.strftime('%H:%M:%S'), **self._status_cache[1]}
 
 
 # Instance globale
@@ -2,16 +2,23 @@
 # -*- coding: utf-8 -*-
 """Exécuteur principal du questionnaire."""
 
+import argparse
+import asyncio
 import logging
-import traceback
+import logging.handlers
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Union
-
-import undetected_chromedriver as uc
+from typing import TYPE_CHECKING, List, Optional, Union
 
 from bot.config_loader import config
 from bot.config import TIMEOUTS
-from bot.utils.helpers import retry_on_failure
+from bot.utils.driver_manager import create_survey_context, dispose_context, driver_pool
+from bot.utils.helpers import invalidate_element_cache
 from bot.automation import (
     step_1_start_survey,
     step_2_age_selection,
@@ -24,112 +31,257 @@ from bot.automation import (
     step_6_dimension_ratings,
     step_7_order_accuracy,
     step_8_problem_encountered,
-    session_data
+    SurveyState
 )
 
+if TYPE_CHECKING:
+    import undetected_chromedriver as uc
+
 logger = logging.getLogger(__name__)
 
 
-def run_survey_bot(driver: uc.Chrome) -> bool:
-    """Exécute le bot de questionnaire."""
+# Étapes de base (1-4) : l'étape 4 détermine les étapes conditionnelles
+BASE_STEPS = (
+    (step_1_start_survey, "Page d'accueil - Commencer l'enquête", 1),
+    (step_2_age_selection, "Sélection tranche d'âge", 2),
+    (step_3_ticket_info, "Informations du ticket", 3),
+    (step_4_order_location, "Lieu de commande", 4),
+)
+
+# Étapes conditionnelles selon le lieu de commande (clé = SurveyState.requires_extra_steps)
+EXTRA_STEPS = {
+    'borne_comptoir': ("Borne/Comptoir", (
+        (step_4b_consumption_type, "Type de consommation", "4b"),
+        (step_4c_pickup_location, "Lieu de récupération", "4c"),
+    )),
+    'click_collect': ("Click & Collect", (
+        (step_4d_click_collect_pickup, "Lieu de récupération Click & Collect", "4d"),
+    )),
+}
+
+# Étapes finales (5-8)
+FINAL_STEPS = (
+    (step_5_satisfaction_comment, "Satisfaction générale + commentaire", 5),
+    (step_6_dimension_ratings, "Notes sur chaque dimension", 6),
+    (step_7_order_accuracy, "Commande exacte", 7),
+    (step_8_problem_encountered, "Problème rencontré", 8),
+)
+
+
+def _survey_steps(state: SurveyState):
+    """
+    Liste complète des étapes, dans l'ordre d'exécution.
+    
+    Générateur : les étapes conditionnelles ne sont choisies qu'une fois
+    l'étape 4 exécutée (state.requires_extra_steps renseigné).
+    """
+    yield from BASE_STEPS
+    
+    extra_steps = EXTRA_STEPS.get(state.requires_extra_steps)
+    if extra_steps:
+        label, conditional_steps = extra_steps
+        logger.info("🔀 Étapes supplémentaires: %s", label)
+        yield from conditional_steps
+    
+    yield from FINAL_STEPS
+
+
+def _run_steps(driver, state: SurveyState, steps) -> bool:
+    """Exécute les étapes dans l'ordre ; s'arrête à la première en échec."""
+    for step_func, step_name, step_num in steps:
+        if not _execute_step(driver, step_func, state, step_name, step_num):
+            return False
+    return True
+
+
+def run_survey_bot(driver: "uc.Chrome", state: Optional[SurveyState] = None) -> bool:
+    """
+    Exécute le bot de questionnaire.
+    
+    Args:
+        driver: Navigateur sur lequel le questionnaire est ouvert
+        state: État du questionnaire, rempli au fil des étapes (catégorie, CAPTCHA...) ;
+               l'appelant le fournit pour le consulter après coup
+    """
+    if state is None:
+        state = SurveyState()
     try:
-        session_data['start_time'] = datetime.now()
-        session_data['requires_extra_steps'] = False
-        session_data['captcha_detected'] = False  # Réinitialiser le flag CAPTCHA
+        state.start_time = datetime.now()
+        state.requires_extra_steps = None
+        state.captcha_detected = False  # Réinitialiser le flag CAPTCHA
         logger.info("🚀 Démarrage du bot de questionnaire")
         
-        # Étapes de base (1-4)
-        base_steps = [
-            (step_1_start_survey, "Page d'accueil - Commencer l'enquête", 1),
-            (step_2_age_selection, "Sélection tranche d'âge", 2),
-            (step_3_ticket_info, "Informations du ticket", 3),
-            (step_4_order_location, "Lieu de commande", 4),
-        ]
-        
-        # Exécuter les étapes de base
-        for step_func, step_name, step_num in base_steps:
-            if not _execute_step(driver, step_func, step_name, step_num):
-                return False
-        
-        # Étapes conditionnelles selon le type de commande
-        extra_steps_type = session_data.get('requires_extra_steps')
-        
-        if extra_steps_type == 'borne_comptoir':
-            logger.info("🔀 Étapes supplémentaires: Borne/Comptoir")
-            
-            conditional_steps = [
-                (step_4b_consumption_type, "Type de consommation", "4b"),
-                (step_4c_pickup_location, "Lieu de récupération", "4c"),
-            ]
-            
-            for step_func, step_name, step_num in conditional_steps:
-                if not _execute_step(driver, step_func, step_name, step_num):
-                    return False
-        
-        elif extra_steps_type == 'click_collect':
-            logger.info("🔀 Étapes supplémentaires: Click & Collect")
-            
-            if not _execute_step(driver, step_4d_click_collect_pickup, "Lieu de récupération Click & Collect", "4d"):
-                return False
-        
-        # Étapes finales (5-8)
-        final_steps = [
-            (step_5_satisfaction_comment, "Satisfaction générale + commentaire", 5),
-            (step_6_dimension_ratings, "Notes sur chaque dimension", 6),
-            (step_7_order_accuracy, "Commande exacte", 7),
-            (step_8_problem_encountered, "Problème rencontré", 8)
-        ]
-        
-        for step_func, step_name, step_num in final_steps:
-            if not _execute_step(driver, step_func, step_name, step_num):
-                return False
+        if not _run_steps(driver, state, _survey_steps(state)):
+            return False
         
         # Succès
-        duration = (datetime.now() - session_data['start_time']).total_seconds()
-        logger.info(f"⏱️  Durée totale: {duration:.2f} secondes")
+        duration = (datetime.now() - state.start_time).total_seconds()
+        logger.info("⏱️  Durée totale: %.2f secondes", duration)
         logger.info("🎉 Questionnaire complété avec succès!")
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Erreur critique: {str(e)}")
+        logger.error("❌ Erreur critique: %s", e)
         return False
 
 
-def _execute_step(driver, step_func, step_name: str, step_num: Union[int, str]) -> bool:
+def _execute_step(driver, step_func, state: SurveyState, step_name: str, step_num: Union[int, str]) -> bool:
     """Exécute une étape du questionnaire avec retry automatique."""
     max_retries = TIMEOUTS.get('max_retries', 3)
     retry_delay = TIMEOUTS.get('retry_delay', 2)
     
     for attempt in range(1, max_retries + 1):
         try:
-            result = step_func(driver)
+            if attempt > 1:
+                # Les éléments mis en cache à la tentative précédente peuvent être périmés
+                invalidate_element_cache(driver)
+            started = time.perf_counter()
+            result = step_func(driver, state)
+            logger.debug("⏱️  Étape %s: %.2fs (tentative %s)", step_num, time.perf_counter() - started, attempt)
             
             if result:
                 if attempt > 1:
-                    logger.info(f"✅ Étape {step_num} réussie après {attempt} tentatives: {step_name}")
+                    logger.info("✅ Étape %s réussie après %s tentatives: %s", step_num, attempt, step_name)
                 return True
             else:
                 if attempt < max_retries:
-                    logger.warning(f"⚠️ Tentative {attempt}/{max_retries} échouée pour l'étape {step_num}: {step_name}")
-                    import time
+                    logger.warning("⚠️ Tentative %s/%s échouée pour l'étape %s: %s", attempt, max_retries, step_num, step_name)
                     time.sleep(retry_delay * attempt)  # Backoff exponentiel
                 else:
-                    logger.error(f"❌ Échec de l'étape {step_num} après {max_retries} tentatives: {step_name}")
+                    logger.error("❌ Échec de l'étape %s après %s tentatives: %s", step_num, max_retries, step_name)
                     return False
         
         except Exception as e:
             if attempt < max_retries:
-                logger.warning(f"⚠️ Erreur à l'étape {step_num} (tentative {attempt}/{max_retries}): {e}")
-                import time
+                logger.warning("⚠️ Erreur à l'étape %s (tentative %s/%s): %s", step_num, attempt, max_retries, e)
                 time.sleep(retry_delay * attempt)
             else:
-                logger.error(f"❌ Étape {step_num} ({step_name}) échouée après {max_retries} tentatives: {str(e)}")
+                logger.error("❌ Étape %s (%s) échouée après %s tentatives: %s", step_num, step_name, max_retries, e)
                 return False
     
     return False
 
 
-def get_session_data() -> Dict:
-    """Retourne les données de session."""
-    return session_data
+def run_survey(chrome_options: dict, survey_url: str) -> bool:
+    """Exécute un questionnaire complet avec un driver dédié emprunté au pool."""
+    with driver_pool.driver(chrome_options) as driver:
+        if not driver:
+            logger.error("❌ Impossible d'obtenir un navigateur")
+            return False
+        
+        # Chaque questionnaire tourne dans son propre BrowserContext (Chrome reste lancé)
+        context_id = create_survey_context(driver, chrome_options)
+        try:
+            try:
+                driver.get(survey_url)
+            except Exception as e:
+                logger.error("❌ Erreur lors du chargement de la page: %s", e)
+                return False
+            
+            return run_survey_bot(driver)
+        finally:
+            dispose_context(driver, context_id)
+
+
+async def run_survey_async(executor: Executor, chrome_options: dict, survey_url: str) -> bool:
+    """Variante asynchrone : le questionnaire (bloquant) tourne dans un thread ou processus de l'executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, run_survey, chrome_options, survey_url)
+
+
+def _init_worker_process(log_queue: "multiprocessing.Queue", level: int) -> None:
+    """Initialise un processus worker : logs renvoyés au parent, pool de drivers fermé à la sortie."""
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter(f"[W{os.getpid()}] %(message)s"))
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [handler]
+    root_logger.setLevel(level)
+    
+    # Les workers se terminent par os._exit() : atexit n'y est jamais appelé, les Chrome
+    # du pool du worker resteraient ouverts. Les finaliseurs multiprocessing, eux, sont exécutés.
+    multiprocessing.util.Finalize(None, driver_pool.shutdown, exitpriority=10)
+
+
+def run_surveys_batch(count: int, chrome_options: dict, survey_url: str,
+                      max_workers: Optional[int] = None, use_processes: bool = False) -> List[bool]:
+    """
+    Exécute plusieurs questionnaires en parallèle (un navigateur isolé par worker).
+    
+    Args:
+        count: Nombre de questionnaires à exécuter
+        chrome_options: Options Chrome (voir config.get_chrome_options())
+        survey_url: URL du questionnaire
+        max_workers: Nombre de navigateurs simultanés (défaut: batch.max_workers de config.yaml,
+                     sinon moitié des CPU, Chrome est gourmand en RAM)
+        use_processes: Un processus par worker (pool de drivers propre à chacun)
+                       au lieu d'un thread ; les logs sont préfixés par le PID du worker
+    
+    Returns:
+        Liste des résultats (True = succès) dans l'ordre de lancement
+    """
+    if max_workers is None:
+        max_workers = config.get_batch_workers()
+    
+    listener = None
+    if use_processes:
+        # Les logs des workers remontent vers les handlers du processus principal (GUI, fichier)
+        root_logger = logging.getLogger()
+        # spawn et non fork : un worker forké hériterait du driver_pool du parent (et de ses
+        # sessions Chrome inactives), qu'il partagerait puis fermerait à sa sortie
+        mp_context = multiprocessing.get_context('spawn')
+        log_queue = mp_context.Queue()
+        listener = logging.handlers.QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+        listener.start()
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                                       initializer=_init_worker_process,
+                                       initargs=(log_queue, root_logger.level))
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    async def _gather() -> List[bool]:
+        with executor:
+            return await asyncio.gather(*[
+                run_survey_async(executor, chrome_options, survey_url)
+                for _ in range(count)
+            ])
+    
+    try:
+        return list(asyncio.run(_gather()))
+    finally:
+        if listener is not None:
+            listener.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée en ligne de commande des lots : python -m bot.survey_runner N [--workers W] [--processes]
+    
+    Les lots ne passent pas par le planificateur (horaires, quota journalier) de la GUI.
+    
+    Returns:
+        Code de sortie (0 si tous les questionnaires ont réussi)
+    """
+    parser = argparse.ArgumentParser(description="Exécute un lot de questionnaires en parallèle.")
+    parser.add_argument('count', type=int, help="nombre de questionnaires à exécuter")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="navigateurs simultanés (défaut: batch.max_workers de config.yaml)")
+    parser.add_argument('--processes', action='store_true',
+                        help="un processus par worker au lieu d'un thread")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
+    survey_url = config.get('survey_url')
+    if not survey_url:
+        logger.error("❌ URL du questionnaire non trouvée dans la configuration")
+        return 2
+    
+    results = run_surveys_batch(args.count, config.get_chrome_options(), survey_url,
+                                max_workers=args.workers, use_processes=args.processes)
+    logger.info("📊 Lot terminé: %s/%s questionnaires réussis", sum(results), len(results))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
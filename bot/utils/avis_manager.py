@@ -2,78 +2,145 @@
 # -*- coding: utf-8 -*-
 """Gestion des avis clients."""
 
+import mmap
 import os
+import re
 import random
 import logging
-from typing import Dict
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Numérotation en début de ligne ("12. Super service...")
+_NUMBERING_RE = re.compile(r'^\d+\.\s*')
+
+
+# Tirages aléatoires tentés avant de filtrer explicitement les avis récents
+_MAX_DRAWS = 8
+
+# Au-delà de cette taille, les fichiers d'avis sont lus via mmap (pas de copie dans un buffer Python)
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _iter_lines(path: str) -> Iterator[str]:
+    """Itère sur les lignes d'un fichier texte UTF-8 (mmap pour les gros fichiers)."""
+    if os.path.getsize(path) <= _MMAP_THRESHOLD:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from f
+        return
+    
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            for raw_line in iter(mm.readline, b''):
+                yield raw_line.decode('utf-8')
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=16)
+def _read_avis_list(avis_file: str, mtime: int) -> Tuple[str, ...]:
+    """
+    Lit et nettoie un fichier d'avis (mis en cache par (fichier, date de modification)).
+    
+    Seule la partie déterministe (lecture + parsing) est mise en cache,
+    le tirage aléatoire reste fait à chaque appel dans AvisManager.load_avis.
+    """
+    avis_lines = []
+    for line in _iter_lines(avis_file):
+        line = line.strip()
+        if line and not line.startswith('AVIS'):
+            cleaned_line = _NUMBERING_RE.sub('', line)
+            if cleaned_line:
+                avis_lines.append(cleaned_line)
+    
+    return tuple(avis_lines)
+
 
 class AvisManager:
     """Gestionnaire des fichiers d'avis."""
     
-    def __init__(self, avis_mapping: Dict[str, str]):
+    def __init__(self, avis_mapping: Mapping[str, str]):
         """Initialise le gestionnaire d'avis."""
-        self.avis_mapping = avis_mapping
-        self._cache = {}
+        # Copie figée : lectures sans verrou, toute mutation lève une TypeError
+        self.avis_mapping = MappingProxyType(dict(avis_mapping))
         self._recent_avis = {}  # Pour rotation intelligente (#11)
+        self._recent_lock = threading.Lock()  # load_avis est appelé en parallèle par les lots en threads
         self._max_recent = 5  # Nombre d'avis récents à éviter
     
+    def _resolve_avis_file(self, category: str = None) -> str:
+        """Retourne le fichier d'avis d'une catégorie (drive par défaut)."""
+        if not category or category not in self.avis_mapping:
+            return self.avis_mapping.get('drive')
+        return self.avis_mapping.get(category)
+    
+    def _load_avis_list(self, category: str = None) -> Tuple[str, ...]:
+        """
+        Retourne les avis d'une catégorie, relus uniquement si le fichier a changé.
+        
+        Le cache survit d'un questionnaire à l'autre : seul un stat() est fait à chaque
+        appel, la lecture et le parsing ne sont refaits qu'après modification du fichier.
+        """
+        avis_file = self._resolve_avis_file(category)
+        
+        # Vérifier si le fichier existe
+        try:
+            mtime = os.stat(avis_file).st_mtime_ns
+        except OSError:
+            logger.error("❌ Fichier d'avis introuvable: %s", avis_file)
+            return ()
+        
+        return _read_avis_list(avis_file, mtime)
+    
+    def invalidate(self) -> None:
+        """Vide le cache des avis (force une relecture, ex: après édition dans la GUI)."""
+        _read_avis_list.cache_clear()
+    
     def load_avis(self, category: str = None) -> str:
         """Charge un avis aléatoire depuis les fichiers."""
         try:
-            # Déterminer le fichier à utiliser
-            if not category or category not in self.avis_mapping:
-                avis_file = self.avis_mapping.get('drive')
-            else:
-                avis_file = self.avis_mapping.get(category)
-            
-            # Vérifier si le fichier existe
-            if not os.path.exists(avis_file):
-                logger.error(f"❌ Fichier d'avis introuvable: {avis_file}")
-                return "Excellent service, très satisfait de ma visite !"
-            
-            # Charger depuis le cache ou lire le fichier
-            if avis_file not in self._cache:
-                with open(avis_file, 'r', encoding='utf-8') as f:
-                    avis_lines = []
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('AVIS'):
-                            import re
-                            cleaned_line = re.sub(r'^\d+\.\s*', '', line)
-                            if cleaned_line:
-                                avis_lines.append(cleaned_line)
-                    self._cache[avis_file] = avis_lines
-            
-            avis_list = self._cache[avis_file]
+            avis_file = self._resolve_avis_file(category)
+            avis_list = self._load_avis_list(category)
             
             if not avis_list:
-                logger.error(f"❌ Aucun avis trouvé dans le fichier: {avis_file}")
+                logger.error("❌ Aucun avis trouvé dans le fichier: %s", avis_file)
                 return "Excellent service, très satisfait de ma visite !"
             
-            # Rotation intelligente (#11) - Éviter de répéter les mêmes avis
-            recent = self._recent_avis.get(avis_file, [])
-            available_avis = [a for a in avis_list if a not in recent]
-            
-            # Si tous les avis ont été récemment utilisés, réinitialiser
-            if not available_avis:
-                available_avis = avis_list
-                recent = []
-            
-            selected_avis = random.choice(available_avis)
-            
-            # Ajouter à la liste des récents
-            recent.append(selected_avis)
-            if len(recent) > self._max_recent:
-                recent.pop(0)
-            self._recent_avis[avis_file] = recent
+            # Rotation intelligente (#11) - Éviter de répéter les mêmes avis ; lecture, tirage et
+            # mise à jour des récents sous verrou (sinon deux workers peuvent tirer le même avis)
+            with self._recent_lock:
+                recent = self._recent_avis.get(avis_file, [])
+                
+                # Tirage direct dans la liste en cache (rejet des avis récents) : pas de copie filtrée
+                selected_avis = None
+                if len(avis_list) > len(recent):
+                    for _ in range(_MAX_DRAWS):
+                        candidate = random.choice(avis_list)
+                        if candidate not in recent:
+                            selected_avis = candidate
+                            break
+                
+                if selected_avis is None:
+                    available_avis = [a for a in avis_list if a not in recent]
+                    # Si tous les avis ont été récemment utilisés, réinitialiser
+                    if not available_avis:
+                        available_avis = avis_list
+                        recent = []
+                    selected_avis = random.choice(available_avis)
+                
+                # Ajouter à la liste des récents
+                recent.append(selected_avis)
+                if len(recent) > self._max_recent:
+                    recent.pop(0)
+                self._recent_avis[avis_file] = recent
             
             return selected_avis
             
         except Exception as e:
-            logger.error(f"❌ Erreur lors de la sélection de l'avis: {e}")
+            logger.error("❌ Erreur lors de la sélection de l'avis: %s", e)
             return "Excellent service, très satisfait de ma visite !"
     
     def validate_avis_files(self) -> Dict[str, tuple]:
@@ -2,21 +2,169 @@
 # -*- coding: utf-8 -*-
 """Gestion du driver Chrome."""
 
+import atexit
 import logging
+import queue
 import random
+import threading
 import time
-import traceback
-from typing import Optional
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
 
-import undetected_chromedriver as uc
 from selenium.webdriver import ActionChains
-from selenium_stealth import stealth
+
+from bot.config import WEBDRIVER_POOL_SIZE
+from bot.config_loader import config
+from bot.utils.helpers import build_jitter_points, human_mouse_move, next_jitter
+from bot.utils.patch_driver import get_patched_driver_path
+
+if TYPE_CHECKING:
+    import undetected_chromedriver as uc
 
 logger = logging.getLogger(__name__)
 
+# Patchs anti-détection regroupés en un seul payload CDP
+_STEALTH_SCRIPT = '''
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Variables injectées par chromedriver ($cdc_..., cdc_...)
+    for (const key of Object.keys(window)) {
+        if (/^\\$?cdc_/.test(key)) {
+            delete window[key];
+        }
+    }
+    
+    window.chrome = {
+        runtime: {}
+    };
+    
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['fr-FR', 'fr', 'en-US', 'en']
+    });
+'''
+
+
+# Ressources sans effet sur le remplissage du questionnaire
+_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.ico",
+    "*google-analytics.com*", "*googletagmanager.com*", "*facebook.net*",
+    "*doubleclick.net*", "*hotjar.com*",
+]
+
+
+def _block_resources(driver) -> None:
+    """Bloque images/polices/analytics sur l'onglet courant (moins de requêtes, DOM prêt plus tôt)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+    except Exception as e:
+        logger.warning("⚠️ Impossible de bloquer les ressources inutiles (continuation): %s", e)
 
-def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
+
+def _apply_stealth(driver, chrome_options: dict) -> None:
+    """
+    Applique selenium_stealth une seule fois par driver en mémorisant les commandes CDP émises.
+    
+    Les scripts CDP sont propres à chaque onglet : les onglets suivants (contextes isolés des
+    questionnaires) rejouent driver._stealth_commands via _register_tab_scripts au lieu de
+    relancer selenium_stealth (lecture de ses scripts et réglages à chaque questionnaire).
+    """
+    from selenium_stealth import stealth
+    
+    commands = []
+    execute_cdp_cmd = driver.execute_cdp_cmd
+    
+    def recording_cdp_cmd(cmd, cmd_args):
+        commands.append((cmd, cmd_args))
+        return execute_cdp_cmd(cmd, cmd_args)
+    
+    driver.execute_cdp_cmd = recording_cdp_cmd
+    try:
+        stealth(
+            driver,
+            languages=chrome_options['languages'],
+            vendor=chrome_options['vendor'],
+            platform=chrome_options['platform'],
+            webgl_vendor=chrome_options['webgl_vendor'],
+            renderer=chrome_options['renderer'],
+            fix_hairline=True,
+            user_agent=chrome_options["user_agent"]
+        )
+    finally:
+        del driver.execute_cdp_cmd  # Retour à la méthode de la classe
+        driver._stealth_commands = commands
+
+
+def _register_tab_scripts(driver, chrome_options: Optional[dict] = None) -> None:
+    """Enregistre sur l'onglet courant les scripts anti-détection et le blocage réseau du driver."""
+    for cmd, cmd_args in getattr(driver, '_stealth_commands', ()):
+        driver.execute_cdp_cmd(cmd, cmd_args)
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _STEALTH_SCRIPT})
+    if (chrome_options or {}).get('block_resources', True):
+        _block_resources(driver)
+
+
+def _widen_connection_pool(driver, maxsize: int = WEBDRIVER_POOL_SIZE) -> None:
+    """
+    Agrandit le pool urllib3 de la connexion chromedriver.
+    
+    undetected_chromedriver ne transmet pas de ClientConfig à la création du driver : avec
+    Selenium ≥ 4.26, la connexion est recréée via l'API publique (ClientConfig.init_args_for_pool_manager)
+    et remplace celle du driver. Les versions plus anciennes passent par le repli privé.
+    """
+    executor = driver.command_executor
+    client_config = getattr(executor, 'client_config', None)
+    if client_config is not None and hasattr(client_config, 'init_args_for_pool_manager'):
+        try:
+            from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+            
+            # Selenium lit les arguments du PoolManager sous cette clé imbriquée
+            client_config.init_args_for_pool_manager = {'init_args_for_pool_manager': {'maxsize': maxsize}}
+            driver.command_executor = ChromeRemoteConnection(
+                remote_server_addr=client_config.remote_server_addr,
+                client_config=client_config
+            )
+            executor.close()
+            return
+        except Exception as e:
+            logger.warning("⚠️ ClientConfig inutilisable pour le pool chromedriver, repli: %s", e)
+    
+    _widen_connection_pool_private(executor, maxsize)
+
+
+def _widen_connection_pool_private(executor, maxsize: int) -> None:
+    """
+    Repli : règle le PoolManager déjà créé (attribut privé RemoteConnection._conn).
+    
+    Peut cesser de fonctionner à une mise à jour de Selenium ou urllib3 : chaque usage est signalé.
+    Les pools existants sont vidés pour être recréés à la nouvelle taille.
+    """
+    pool_manager = getattr(executor, '_conn', None)
+    pool_kw = getattr(pool_manager, 'connection_pool_kw', None)
+    if not isinstance(pool_kw, dict) or not hasattr(pool_manager, 'clear'):
+        # Structure interne de Selenium modifiée : une seule connexion reste utilisée
+        logger.warning("⚠️ Pool de connexions chromedriver non modifié (version de Selenium non prise en charge: %s)",
+                       type(pool_manager).__name__)
+        return
+    
+    logger.warning("⚠️ Selenium sans ClientConfig : pool chromedriver agrandi via un attribut privé")
+    pool_kw['maxsize'] = maxsize
+    pool_manager.clear()
+
+
+def setup_driver(chrome_options: dict) -> Optional["uc.Chrome"]:
     """Configure et retourne une instance du navigateur Chrome avec anti-détection avancée."""
+    # Import lourd différé : seulement quand un navigateur est réellement lancé
+    import undetected_chromedriver as uc
+    
     driver = None
     try:
         options = uc.ChromeOptions()
@@ -26,14 +174,30 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
         options.add_argument('--disable-infobars')
         options.add_argument('--disable-notifications')
         options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--disable-popup-blocking')
         
+        # Pas de throttling du rendu pendant le remplissage (fenêtre masquée/en arrière-plan)
+        options.add_argument('--memory-pressure-off')
+        options.add_argument('--disable-backgrounding-occluded-windows')
+        options.add_argument('--disable-renderer-backgrounding')
+        options.add_argument('--disable-features=CalculateNativeWinOcclusion')
+        
+        # --disable-dev-shm-usage force les buffers partagés sur /tmp (disque) : à n'activer que
+        # si /dev/shm est trop petit (conteneurs Docker sans --shm-size=2g)
+        if chrome_options.get('shm_workaround', False):
+            options.add_argument('--disable-dev-shm-usage')
+        
+        if chrome_options.get('headless', False):
+            options.add_argument('--headless=new')
+        
         prefs = {
             "credentials_enable_service": False,
             "profile.password_manager_enabled": False,
             "profile.default_content_setting_values.notifications": 2
         }
+        if chrome_options.get('block_resources', True):
+            # Pas de décodage d'images : le questionnaire se remplit via les attributs du DOM
+            prefs["profile.managed_default_content_settings.images"] = 2
         options.add_experimental_option("prefs", prefs)
         
         # Création du driver (logs détaillés supprimés pour la console)
@@ -42,8 +206,10 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
             use_subprocess=True,
             version_main=None,
             suppress_welcome=True,
-            driver_executable_path=None
+            # Binaire patché une fois par version (None = patch automatique d'undetected_chromedriver)
+            driver_executable_path=get_patched_driver_path(chrome_options.get('chromedriver_path'))
         )
+        _widen_connection_pool(driver)
         
         # Attendre que le driver soit stable et charger une page blanche pour maintenir la fenêtre ouverte
         time.sleep(1)  # Délai pour stabiliser le driver
@@ -65,23 +231,14 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
             driver.get("about:blank")
             time.sleep(0.5)  # Attendre que la page se charge
         except Exception as e:
-            logger.warning(f"⚠️ Impossible de charger about:blank: {e}")
+            logger.warning("⚠️ Impossible de charger about:blank: %s", e)
         
         # Application des paramètres de furtivité avec gestion d'erreur
         try:
-            stealth(
-                driver,
-                languages=chrome_options['languages'],
-                vendor=chrome_options['vendor'],
-                platform=chrome_options['platform'],
-                webgl_vendor=chrome_options['webgl_vendor'],
-                renderer=chrome_options['renderer'],
-                fix_hairline=True,
-                user_agent=chrome_options["user_agent"]
-            )
+            _apply_stealth(driver, chrome_options)
         except Exception as stealth_error:
             # Si stealth échoue, on continue quand même (les scripts manuels seront injectés)
-            logger.warning(f"⚠️ Erreur lors de l'application de stealth (continuation): {stealth_error}")
+            logger.warning("⚠️ Erreur lors de l'application de stealth (continuation): %s", stealth_error)
             # Vérifier que la fenêtre est toujours ouverte
             try:
                 _ = driver.current_url
@@ -94,30 +251,13 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
                         pass
                 return None
         
-        # Injection des scripts anti-détection avec gestion d'erreur
+        # Injection des scripts anti-détection (une seule fois par driver, exécutés par Chrome
+        # avant tout script du site à chaque navigation, sans execute_script)
         try:
-            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                    
-                    window.chrome = {
-                        runtime: {}
-                    };
-                    
-                    Object.defineProperty(navigator, 'plugins', {
-                        get: () => [1, 2, 3, 4, 5]
-                    });
-                    
-                    Object.defineProperty(navigator, 'languages', {
-                        get: () => ['fr-FR', 'fr', 'en-US', 'en']
-                    });
-                '''
-            })
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _STEALTH_SCRIPT})
         except Exception as cdp_error:
             # Si l'injection CDP échoue, on continue quand même
-            logger.warning(f"⚠️ Erreur lors de l'injection CDP (continuation): {cdp_error}")
+            logger.warning("⚠️ Erreur lors de l'injection CDP (continuation): %s", cdp_error)
             # Vérifier que la fenêtre est toujours ouverte
             try:
                 _ = driver.current_url
@@ -130,14 +270,18 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
                         pass
                 return None
         
+        # Blocage des ressources inutiles au remplissage (images, polices, analytics)
+        if chrome_options.get('block_resources', True):
+            _block_resources(driver)
+        
         # Configuration de la fenêtre avec vérification
         try:
-            width, height = map(int, chrome_options['window_size'].split(','))
+            width, height = chrome_options.get('window_size_wh') or map(int, chrome_options['window_size'].split(','))
             width += random.randint(-20, 20)
             height += random.randint(-20, 20)
             driver.set_window_size(width, height)
         except Exception as size_error:
-            logger.warning(f"⚠️ Erreur lors du redimensionnement (continuation): {size_error}")
+            logger.warning("⚠️ Erreur lors du redimensionnement (continuation): %s", size_error)
             # Vérifier que la fenêtre est toujours ouverte
             try:
                 _ = driver.current_url
@@ -152,10 +296,13 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
         
         # Simulation de mouvement de souris avec vérification
         try:
-            action = ActionChains(driver)
-            action.move_by_offset(random.randint(0, 100), random.randint(0, 100)).perform()
+            driver._action_chain = ActionChains(driver)  # Réutilisé par bot.utils.helpers
+            driver._jitter_points = build_jitter_points()  # Trajectoires pré-calculées (Bézier)
+            driver._jitter_index = 0
+            dx, dy = next_jitter(driver)
+            human_mouse_move(driver, abs(dx), abs(dy))  # Pointeur en (0, 0) : offset positif
         except Exception as mouse_error:
-            logger.warning(f"⚠️ Erreur lors du mouvement de souris (continuation): {mouse_error}")
+            logger.warning("⚠️ Erreur lors du mouvement de souris (continuation): %s", mouse_error)
         
         # Vérification finale que le driver est fonctionnel
         try:
@@ -172,8 +319,8 @@ def setup_driver(chrome_options: dict) -> Optional[uc.Chrome]:
             return None
         
     except Exception as e:
-        logger.error(f"❌ Erreur lors de l'initialisation du navigateur: {e}")
-        logger.debug(f"Détails: {traceback.format_exc()}")
+        logger.error("❌ Erreur lors de l'initialisation du navigateur: %s", e)
+        logger.debug("Détails:", exc_info=True)
         if driver:
             try:
                 driver.quit()
@@ -189,4 +336,175 @@ def cleanup_driver(driver) -> None:
             driver.quit()
             logger.info("✅ Navigateur fermé avec succès")
         except Exception as e:
-            logger.error(f"❌ Erreur lors de la fermeture du navigateur: {e}")
+            logger.error("❌ Erreur lors de la fermeture du navigateur: %s", e)
+
+
+def create_survey_context(driver, chrome_options: Optional[dict] = None) -> Optional[str]:
+    """
+    Ouvre un onglet dans un BrowserContext isolé (cookies/stockage vierges) et bascule dessus.
+    
+    Beaucoup plus rapide que relancer Chrome : le processus, V8 et la pile réseau restent chauds.
+    
+    Returns:
+        L'identifiant du contexte (à passer à dispose_context), ou None en cas d'échec
+    """
+    context_id = None
+    try:
+        driver._base_window = driver.current_window_handle
+        handles_before = set(driver.window_handles)
+        
+        context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        driver.execute_cdp_cmd("Target.createTarget", {
+            "url": "about:blank",
+            "browserContextId": context_id
+        })
+        
+        new_handles = [h for h in driver.window_handles if h not in handles_before]
+        if not new_handles:
+            raise RuntimeError("onglet du nouveau contexte introuvable")
+        driver.switch_to.window(new_handles[0])
+        
+        # Scripts anti-détection et blocage réseau sont enregistrés par onglet : on rejoue ceux
+        # mémorisés à la création du driver (selenium_stealth n'est pas relancé)
+        _register_tab_scripts(driver, chrome_options)
+        
+        return context_id
+    except Exception as e:
+        logger.warning("⚠️ Impossible de créer un contexte de navigation isolé: %s", e)
+        if context_id:
+            # Contexte à moitié prêt (onglet sans scripts anti-détection) : on l'abandonne
+            try:
+                driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+                driver.switch_to.window(driver._base_window)
+            except Exception:
+                pass
+        return None
+
+
+def dispose_context(driver, context_id: Optional[str]) -> None:
+    """Ferme le contexte isolé d'un questionnaire et revient sur l'onglet principal."""
+    if not context_id:
+        return
+    
+    try:
+        driver.close()
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+    except Exception as e:
+        logger.warning("⚠️ Erreur lors de la fermeture du contexte de navigation: %s", e)
+    
+    try:
+        driver.switch_to.window(getattr(driver, '_base_window', None) or driver.window_handles[0])
+    except Exception as e:
+        logger.warning("⚠️ Impossible de revenir sur l'onglet principal: %s", e)
+
+
+def _is_driver_alive(driver) -> bool:
+    """Vérifie que la session WebDriver répond encore (fenêtre non fermée, session valide)."""
+    try:
+        _ = driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+_CLEAR_SESSION_STORAGE_SCRIPT = """
+    try { sessionStorage.clear(); } catch (e) {}
+    return location.origin;
+"""
+
+
+class _DriverPool:
+    """
+    Pool de navigateurs Chrome réutilisables.
+    
+    Le lancement de Chrome (processus + handshake CDP + injection stealth) coûte
+    plusieurs secondes : on garde les drivers vivants entre deux sessions et on
+    se contente de vider cookies/stockage/cache au moment de les rendre au pool.
+    Un driver n'est recréé que si sa session est perdue.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None):
+        """
+        Initialise le pool (max_size = nombre de drivers inactifs conservés).
+        
+        Par défaut, batch.max_workers de config.yaml, lu au premier usage du pool et non à l'import.
+        """
+        self._max_size = max_size
+        self._queue: Optional[queue.Queue] = None
+        self._queue_lock = threading.Lock()
+    
+    @property
+    def _idle(self) -> queue.Queue:
+        """File des drivers inactifs, créée au premier usage."""
+        if self._queue is None:
+            with self._queue_lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=self._max_size or config.get_batch_workers())
+        return self._queue
+    
+    def acquire(self, chrome_options: dict) -> Optional["uc.Chrome"]:
+        """Retourne un driver inactif encore valide, ou en crée un nouveau."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            
+            if _is_driver_alive(driver):
+                logger.info("♻️ Navigateur réutilisé depuis le pool")
+                return driver
+            
+            logger.warning("⚠️ Session du navigateur perdue, recréation...")
+            cleanup_driver(driver)
+        
+        return setup_driver(chrome_options)
+    
+    def release(self, driver) -> None:
+        """Réinitialise l'état du navigateur et le rend au pool (ou le ferme si invalide)."""
+        if not driver:
+            return
+        
+        try:
+            # Stockage de l'origine courante (localStorage, IndexedDB...) avant de quitter la page ;
+            # sessionStorage est propre à l'onglet, il est vidé directement
+            origin = driver.execute_script(_CLEAR_SESSION_STORAGE_SCRIPT)
+            if origin and origin != 'null':
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.delete_all_cookies()
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get("about:blank")
+        except Exception as e:
+            logger.warning("⚠️ Réinitialisation du navigateur impossible, fermeture: %s", e)
+            cleanup_driver(driver)
+            return
+        
+        try:
+            self._idle.put_nowait(driver)
+        except queue.Full:
+            cleanup_driver(driver)
+    
+    @contextmanager
+    def driver(self, chrome_options: dict) -> Iterator[Optional["uc.Chrome"]]:
+        """Context manager : acquire() à l'entrée, release() à la sortie."""
+        driver = self.acquire(chrome_options)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+    
+    def shutdown(self) -> None:
+        """Ferme tous les navigateurs inactifs du pool."""
+        if self._queue is None:
+            return  # Pool jamais utilisé
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            cleanup_driver(driver)
+
+
+# Instance globale (fermée automatiquement à la sortie du processus) ; un driver inactif
+# conservé par worker des lots parallèles (run_surveys_batch en threads)
+driver_pool = _DriverPool()
+atexit.register(driver_pool.shutdown)
@@ -2,16 +2,39 @@
 # -*- coding: utf-8 -*-
 """Fonctions utilitaires pour le bot."""
 
+import json
 import random
 import time
 import logging
-from typing import List, Callable, Optional, Any
+from typing import List, Callable, Optional, Any, Tuple, Union
 from functools import wraps
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, ElementNotInteractableException, NoSuchElementException,
+    StaleElementReferenceException, TimeoutException
+)
+from selenium.webdriver import ActionChains
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from bot.config import NEXT_BUTTON_UNION_XPATH, CSS_SELECTORS
 
 logger = logging.getLogger(__name__)
 
 
+def log_event(log: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    Log structuré : nom d'événement + champs.
+    
+    Rien n'est formaté si le niveau est désactivé ; les champs restent accessibles
+    aux handlers via record.event / record.fields.
+    """
+    if log.isEnabledFor(level):
+        log.log(level, "%s %s", event, fields, extra={'event': event, 'fields': fields}, stacklevel=2)
+
+
 def wait_random(min_seconds: float, max_seconds: float) -> None:
     """Attend un nombre aléatoire de secondes avec distribution gaussienne (plus humain)."""
     mean = (min_seconds + max_seconds) / 2
@@ -26,50 +49,91 @@ def wait_random(min_seconds: float, max_seconds: float) -> None:
     time.sleep(delay)
 
 
-def human_typing(element: WebElement, text: str, min_delay: float = 0.05, max_delay: float = 0.10, error_rate: float = 0.02) -> None:
-    """Simule une frappe humaine avec erreurs et corrections occasionnelles."""
-    from selenium.webdriver.common.keys import Keys
+def _plan_typing_chunks(text: str, rng: random.Random, min_delay: float, max_delay: float,
+                        error_rate: float) -> List[Tuple[str, float, Optional[str]]]:
+    """
+    Pré-calcule toute la frappe : (segment, délai, faute de frappe éventuelle).
     
+    Le texte est tapé par rafales de 3-8 caractères (parfois 1 seul) dont les délais sont
+    cumulés ; les rafales ne sont envoyées séparément qu'aux pauses visibles (fin de mot,
+    ponctuation), soit un seul send_keys et un seul sleep par segment.
+    """
+    plan = []
+    segment, delay = '', 0.0
     i = 0
     while i < len(text):
-        char = text[i]
-        
-        # Simuler erreur de frappe (2% du temps)
-        if random.random() < error_rate and char.isalpha():
-            wrong_char = random.choice('abcdefghijklmnopqrstuvwxyz')
-            element.send_keys(wrong_char)
-            time.sleep(random.uniform(min_delay, max_delay))
-            
-            # Pause (réaliser l'erreur)
-            time.sleep(random.uniform(0.2, 0.5))
-            
-            # Corriger avec backspace
-            element.send_keys(Keys.BACKSPACE)
-            time.sleep(random.uniform(0.1, 0.2))
+        # 10% du temps, un seul caractère (préserve la variance du rythme de frappe)
+        size = 1 if rng.random() < 0.10 else rng.randint(3, 8)
+        chunk = text[i:i + size]
+        i += size
         
-        # Taper le bon caractère
-        element.send_keys(char)
+        segment += chunk
+        delay += rng.uniform(min_delay, max_delay) * len(chunk) * 0.6
+        if chunk[-1] in '.,!?':
+            delay += rng.uniform(0.1, 0.2)  # Pause après ponctuation
+        if rng.random() < 0.03:
+            delay += rng.uniform(0.3, 0.8)  # Pause aléatoire (humain réfléchit)
         
-        # Vitesse variable selon le caractère (optimisé pour vitesse)
-        if char == ' ':
-            delay = random.uniform(0.08, 0.15)  # Plus lent pour espace
-        elif char in '.,!?':
-            delay = random.uniform(0.1, 0.2)    # Pause après ponctuation
-        elif char.isupper():
-            delay = random.uniform(0.08, 0.12)  # Majuscule = Shift
-        else:
-            delay = random.uniform(min_delay, max_delay)
+        if ' ' in chunk or chunk[-1] in '.,!?' or i >= len(text):
+            # Simuler erreur de frappe (taux proportionnel à la taille du segment)
+            typo = None
+            if segment[0].isalpha() and rng.random() < error_rate * len(segment):
+                typo = rng.choice('abcdefghijklmnopqrstuvwxyz')
+            plan.append((segment, delay, typo))
+            segment, delay = '', 0.0
+    return plan
+
+
+def human_typing(element: WebElement, text: str, min_delay: float = 0.05, max_delay: float = 0.10, error_rate: float = 0.02) -> None:
+    """
+    Simule une frappe humaine par segments de mots, avec erreurs et corrections occasionnelles.
+    
+    Un send_keys et un sleep par segment au lieu d'un par caractère.
+    """
+    # Générateur local : découpage et délais pré-calculés sans contention sur le module random
+    rng = random.Random()
+    
+    for segment, delay, typo in _plan_typing_chunks(text, rng, min_delay, max_delay, error_rate):
+        if typo:
+            element.send_keys(typo)
+            time.sleep(rng.uniform(0.2, 0.5))  # Pause (réaliser l'erreur)
+            element.send_keys(Keys.BACKSPACE)
+            time.sleep(rng.uniform(0.1, 0.2))
         
+        element.send_keys(segment)
         time.sleep(delay)
+    
+    # Pause après avoir fini de taper
+    time.sleep(rng.uniform(0.2, 0.5))
+
+
+_BACKSPACE_EVENT = {'windowsVirtualKeyCode': 8, 'key': 'Backspace', 'code': 'Backspace'}
+
+
+def human_insert_text(driver, element: WebElement, text: str, min_delay: float = 0.05, max_delay: float = 0.10,
+                      error_rate: float = 0.02) -> None:
+    """
+    Même cadence que human_typing, mais chaque segment est inséré via CDP Input.insertText.
+    
+    send_keys fait émettre par chromedriver un événement clavier par caractère ; Input.insertText
+    insère le segment en une seule commande (les événements input écoutés par la page sont émis).
+    """
+    rng = random.Random()
+    driver.execute_script("arguments[0].focus();", element)
+    
+    for segment, delay, typo in _plan_typing_chunks(text, rng, min_delay, max_delay, error_rate):
+        if typo:
+            driver.execute_cdp_cmd("Input.insertText", {'text': typo})
+            time.sleep(rng.uniform(0.2, 0.5))  # Pause (réaliser l'erreur)
+            driver.execute_cdp_cmd("Input.dispatchKeyEvent", {'type': 'rawKeyDown', **_BACKSPACE_EVENT})
+            driver.execute_cdp_cmd("Input.dispatchKeyEvent", {'type': 'keyUp', **_BACKSPACE_EVENT})
+            time.sleep(rng.uniform(0.1, 0.2))
         
-        # Pause aléatoire (humain réfléchit) - réduite
-        if random.random() < 0.03:  # Réduit de 5% à 3%
-            time.sleep(random.uniform(0.3, 0.8))  # Réduit de 0.5-1.5 à 0.3-0.8
-        
-        i += 1
+        driver.execute_cdp_cmd("Input.insertText", {'text': segment})
+        time.sleep(delay)
     
-        # Pause après avoir fini de taper (optimisé pour vitesse)
-        time.sleep(random.uniform(0.2, 0.5))
+    # Pause après avoir fini de taper
+    time.sleep(rng.uniform(0.2, 0.5))
 
 
 def scroll_to_element(driver, element: WebElement, block: str = 'center') -> None:
@@ -86,15 +150,76 @@ def scroll_to_element(driver, element: WebElement, block: str = 'center') -> Non
         time.sleep(random.uniform(0.2, 0.4))
 
 
+def get_action_chain(driver):
+    """Retourne l'ActionChains réutilisable attaché au driver (créé au premier appel)."""
+    chain = getattr(driver, '_action_chain', None)
+    if chain is None:
+        chain = ActionChains(driver)
+        driver._action_chain = chain
+    return chain
+
+
+def _bezier_point(p0: Tuple[float, float], p1: Tuple[float, float], p2: Tuple[float, float],
+                  p3: Tuple[float, float], t: float) -> Tuple[float, float]:
+    """Point d'une courbe de Bézier cubique au paramètre t (0 <= t <= 1)."""
+    u = 1 - t
+    a, b, c, d = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+    return (a * p0[0] + b * p1[0] + c * p2[0] + d * p3[0],
+            a * p0[1] + b * p1[1] + c * p2[1] + d * p3[1])
+
+
+def build_jitter_points(count: int = 256, curves: int = 16, span: int = 100,
+                        rng: Optional[random.Random] = None) -> List[Tuple[int, int]]:
+    """
+    Pré-calcule des déplacements de souris relatifs le long de courbes de Bézier cubiques.
+    
+    Trajectoires plus naturelles que des offsets uniformes, et un seul tirage aléatoire
+    (rng.sample) pour toutes les courbes au lieu d'un randint par mouvement.
+    """
+    rng = rng or random.Random()
+    steps = max(1, count // curves)
+    coords = rng.sample(range(-span, span + 1), 6 * curves)
+    
+    points = []
+    for i in range(curves):
+        x1, y1, x2, y2, x3, y3 = coords[6 * i:6 * i + 6]
+        control = ((0, 0), (x1, y1), (x2, y2), (x3, y3))
+        previous = (0.0, 0.0)
+        for step in range(1, steps + 1):
+            current = _bezier_point(*control, step / steps)
+            points.append((round(current[0] - previous[0]), round(current[1] - previous[1])))
+            previous = current
+    return points
+
+
+def next_jitter(driver) -> Tuple[int, int]:
+    """Retourne le prochain déplacement pré-calculé du driver (parcours cyclique)."""
+    points = getattr(driver, '_jitter_points', None)
+    if not points:
+        points = driver._jitter_points = build_jitter_points()
+        driver._jitter_index = 0
+    
+    index = getattr(driver, '_jitter_index', 0)
+    driver._jitter_index = (index + 1) % len(points)
+    return points[index]
+
+
+def human_mouse_move(driver, dx: int, dy: int) -> None:
+    """Déplace la souris d'un offset relatif avec l'ActionChains partagé du driver."""
+    chain = get_action_chain(driver)
+    try:
+        chain.move_by_offset(dx, dy).perform()
+    finally:
+        chain.reset_actions()
+
+
 def click_element(driver, element: WebElement) -> None:
     """Clique sur un élément avec mouvement de souris simulé."""
-    from selenium.webdriver import ActionChains
-    
     # Scroll vers l'élément
     scroll_to_element(driver, element)
     
     # Simuler mouvement de souris vers l'élément
-    action = ActionChains(driver)
+    action = get_action_chain(driver)
     action.move_to_element(element)
     
     # Ajouter offset aléatoire (humain ne clique pas au centre exact)
@@ -103,11 +228,14 @@ def click_element(driver, element: WebElement) -> None:
     action.move_by_offset(offset_x, offset_y)
     
     # Pause avant de cliquer (humain hésite)
-    time.sleep(random.uniform(0.1, 0.3))
+    action.pause(random.uniform(0.1, 0.3))
     
     # Cliquer
     action.click()
-    action.perform()
+    try:
+        action.perform()
+    finally:
+        action.reset_actions()
     
     # Pause après clic
     time.sleep(random.uniform(0.2, 0.5))
@@ -115,11 +243,8 @@ def click_element(driver, element: WebElement) -> None:
 
 def safe_find_elements(driver, by, value, timeout: int = 10) -> List[WebElement]:
     """Trouve des éléments de manière sécurisée avec timeout."""
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    
     try:
-        elements = WebDriverWait(driver, timeout).until(
+        elements = get_wait(driver, timeout).until(
             EC.presence_of_all_elements_located((by, value))
         )
         return elements
@@ -129,10 +254,7 @@ def safe_find_elements(driver, by, value, timeout: int = 10) -> List[WebElement]
 
 def safe_find_element(driver, by, value, timeout: int = 10) -> WebElement:
     """Trouve un élément de manière sécurisée avec timeout."""
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    
-    return WebDriverWait(driver, timeout).until(
+    return get_wait(driver, timeout).until(
         EC.presence_of_element_located((by, value))
     )
 
@@ -146,20 +268,19 @@ def random_scroll(driver) -> None:
 
 
 def random_mouse_movement(driver) -> None:
-    """Effectue des mouvements de souris aléatoires."""
-    from selenium.webdriver import ActionChains
+    """Effectue des mouvements de souris aléatoires (envoyés en un seul perform)."""
+    action = get_action_chain(driver)
     
-    action = ActionChains(driver)
-    
-    # 2-4 mouvements aléatoires
+    # 2-4 mouvements le long des courbes pré-calculées, les pauses sont jouées par le navigateur
     num_movements = random.randint(2, 4)
     for _ in range(num_movements):
-        x = random.randint(-100, 100)
-        y = random.randint(-100, 100)
-        action.move_by_offset(x, y)
-        time.sleep(random.uniform(0.1, 0.3))
+        action.move_by_offset(*next_jitter(driver))
+        action.pause(random.uniform(0.1, 0.3))
     
-    action.perform()
+    try:
+        action.perform()
+    finally:
+        action.reset_actions()
 
 
 def simulate_reading_time(min_seconds: float = 1.0, max_seconds: float = 3.0) -> None:
@@ -196,16 +317,16 @@ def retry_on_failure(max_retries: int = 3, delay: float = 2.0, backoff: float =
                 try:
                     result = func(*args, **kwargs)
                     if attempt > 1:
-                        logger.info(f"✅ {func.__name__} réussi après {attempt} tentatives")
+                        logger.info("✅ %s réussi après %s tentatives", func.__name__, attempt)
                     return result
                 except Exception as e:
                     last_exception = e
                     if attempt < max_retries:
-                        logger.warning(f"⚠️ Tentative {attempt}/{max_retries} échouée pour {func.__name__}: {e}")
+                        logger.warning("⚠️ Tentative %s/%s échouée pour %s: %s", attempt, max_retries, func.__name__, e)
                         time.sleep(current_delay)
                         current_delay *= backoff
                     else:
-                        logger.error(f"❌ {func.__name__} a échoué après {max_retries} tentatives")
+                        logger.error("❌ %s a échoué après %s tentatives", func.__name__, max_retries)
             
             raise last_exception
         return wrapper
@@ -240,6 +361,198 @@ def wait_with_check(total_seconds: int, check_interval: float = 1.0, stop_condit
     return True
 
 
+# Localisateur Selenium : tuple (By.*, valeur) ou simple chaîne XPath
+Locator = Union[str, Tuple[str, str]]
+
+
+def _as_locator(locator: Locator) -> Tuple[str, str]:
+    """Normalise un localisateur (une chaîne seule est interprétée comme un XPath)."""
+    if isinstance(locator, str):
+        return (By.XPATH, locator)
+    return locator
+
+
+def get_wait(driver, timeout: float):
+    """Retourne le WebDriverWait réutilisable du driver pour ce timeout (créé au premier appel)."""
+    waits = getattr(driver, '_waits', None)
+    if waits is None:
+        waits = driver._waits = {}
+    wait = waits.get(timeout)
+    if wait is None:
+        wait = waits[timeout] = WebDriverWait(driver, timeout)
+    return wait
+
+
+def wait_for_clickable(driver, locator: Locator, timeout: float = 10, min_pace: float = 0.3, max_pace: float = 0.8) -> WebElement:
+    """
+    Attend qu'un élément soit cliquable puis ajoute une courte pause aléatoire (cadence humaine).
+    
+    Remplace les attentes fixes (wait_random) avant une interaction : on rend la main dès que
+    le DOM est prêt au lieu de dormir un délai arbitraire.
+    
+    Raises:
+        TimeoutException: si l'élément n'est pas cliquable après timeout secondes
+    """
+    element = get_wait(driver, timeout).until(
+        EC.element_to_be_clickable(_as_locator(locator))
+    )
+    time.sleep(random.uniform(min_pace, max_pace))
+    return element
+
+
+def _next_button_clickable(driver):
+    """
+    Condition WebDriverWait : bouton "Suivant" cliquable.
+    
+    Le sélecteur CSS (rapide) est essayé d'abord, l'union XPath (texte) ensuite, sauf si l'une des deux
+    a déjà gagné lors d'une recherche précédente sur ce driver (driver._next_button_winner) :
+    elle est alors essayée en premier. Un bouton trouvé mais pas cliquable laisse sa chance à l'autre.
+    """
+    winner = getattr(driver, '_next_button_winner', None)
+    locators = [(By.CSS_SELECTOR, CSS_SELECTORS['next_button']), (By.XPATH, NEXT_BUTTON_UNION_XPATH)]
+    if winner in locators:
+        locators.remove(winner)
+        locators.insert(0, winner)
+    
+    for locator in locators:
+        try:
+            element = EC.element_to_be_clickable(locator)(driver)
+        except (NoSuchElementException, StaleElementReferenceException):
+            continue
+        if element:
+            driver._next_button_winner = locator
+            return element
+    return False
+
+
+def wait_for_next_button(driver, timeout: float = 10, min_pace: float = 0.3, max_pace: float = 0.8) -> WebElement:
+    """
+    Variante de wait_for_clickable dédiée au bouton "Suivant" (CSS puis repli XPath).
+    
+    Raises:
+        TimeoutException: si aucun bouton n'est cliquable après timeout secondes
+    """
+    element = get_wait(driver, timeout).until(_next_button_clickable)
+    time.sleep(random.uniform(min_pace, max_pace))
+    return element
+
+
+def find_all_cached(driver, locator: Locator, timeout: float = 0, refresh: bool = False) -> List[WebElement]:
+    """
+    Liste des éléments de la page courante, mise en cache sur le driver jusqu'au changement de page.
+    
+    Évite de ré-énumérer les mêmes éléments (un aller-retour chromedriver à chaque fois)
+    entre l'attente de la page et l'étape qui l'exploite.
+    
+    Args:
+        driver: Instance du WebDriver
+        locator: Localisateur des éléments
+        timeout: Si > 0, attend la présence d'au moins un élément (sinon lecture immédiate)
+        refresh: Ignore le cache et relit le DOM
+    """
+    cache = getattr(driver, '_elements_cache', None)
+    if cache is None:
+        cache = driver._elements_cache = {}
+    
+    key = _as_locator(locator)
+    if not refresh and cache.get(key):
+        return cache[key]
+    
+    # Lecture directe d'abord : l'attente n'est lancée que si la page n'est pas prête
+    elements = driver.find_elements(*key)
+    if not elements and timeout:
+        elements = get_wait(driver, timeout).until(EC.presence_of_all_elements_located(key))
+    
+    cache[key] = elements
+    return elements
+
+
+def invalidate_element_cache(driver) -> None:
+    """Vide le cache d'éléments (à appeler dès que la page change)."""
+    driver._elements_cache = {}
+
+
+def wait_for_next_step(driver, sentinel: Locator, timeout: float = 10, previous: Optional[WebElement] = None) -> bool:
+    """
+    Attend que la page suivante soit prête au lieu de dormir un délai fixe après "Suivant".
+    
+    Les éléments sentinelles trouvés sont mis en cache (voir find_all_cached) pour l'étape suivante.
+    
+    Args:
+        driver: Instance du WebDriver
+        sentinel: Localisateur du premier élément attendu sur la page suivante
+        timeout: Temps d'attente maximum en secondes
+        previous: Élément de la page courante ; on attend qu'il soit détaché du DOM
+                  pour ne pas confondre l'ancienne page avec la nouvelle
+    
+    Returns:
+        True si la page suivante est prête, False après timeout
+        (les deux attentes partagent le même délai total)
+    """
+    locator = _as_locator(sentinel)
+    deadline = time.monotonic() + timeout
+    try:
+        if previous is not None:
+            get_wait(driver, timeout).until(EC.staleness_of(previous))
+        invalidate_element_cache(driver)
+        remaining = max(0.0, deadline - time.monotonic())
+        driver._elements_cache[locator] = WebDriverWait(driver, remaining).until(
+            EC.presence_of_all_elements_located(locator)
+        )
+        return True
+    except TimeoutException:
+        logger.warning("⚠️ Page suivante non détectée après %ss (%s)", timeout, locator[1])
+        return False
+
+
+_WAIT_ENABLED_SCRIPT = """
+    var el = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+    var t0 = Date.now();
+    (function poll() {
+        if (!el.disabled && !el.hasAttribute('disabled')) return done(true);
+        if (Date.now() - t0 > timeoutMs) return done(false);
+        setTimeout(poll, 100);
+    })();
+"""
+
+
+def wait_until_enabled(driver, element: WebElement, timeout: float = 8) -> bool:
+    """
+    Attend côté navigateur qu'un bouton soit activé (un seul aller-retour pour toute l'attente).
+    
+    Le polling (100 ms) tourne dans la page via execute_async_script : on rend la main
+    dès que le bouton s'active, sans sleep Python ni relectures successives.
+    
+    Returns:
+        True si le bouton est activé, False après timeout
+    """
+    # Le script timeout par défaut de Selenium (30 s) couvre largement l'attente
+    return bool(driver.execute_async_script(_WAIT_ENABLED_SCRIPT, element, int(timeout * 1000)))
+
+
+_WAIT_CHECKED_SCRIPT = """
+    var el = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+    var t0 = Date.now();
+    (function poll() {
+        if (el.checked) return done(true);
+        if (Date.now() - t0 > timeoutMs) return done(false);
+        setTimeout(poll, 100);
+    })();
+"""
+
+
+def wait_until_checked(driver, element: WebElement, timeout: float = 2) -> bool:
+    """
+    Attend côté navigateur qu'un radio soit coché (même principe que wait_until_enabled).
+    
+    Certains widgets appliquent la coche en différé : on l'attend avant de resélectionner.
+    
+    Returns:
+        True si le radio est coché, False après timeout
+    """
+    return bool(driver.execute_async_script(_WAIT_CHECKED_SCRIPT, element, int(timeout * 1000)))
+
+
 def click_next_button(driver, timeout: int = 10) -> bool:
     """
     Factorisation : Clique sur le bouton "Suivant" de manière sécurisée.
@@ -247,89 +560,241 @@ def click_next_button(driver, timeout: int = 10) -> bool:
     Returns:
         True si le clic a réussi, False sinon
     """
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    
     try:
-        selectors = [
-            "//button[contains(., 'Suivant')]",
-            "//button[contains(text(), 'Suivant')]",
-            "//button[contains(., 'Next')]",
-            "//button[@type='submit']",
-            "//input[@type='submit' and contains(@value, 'Suivant')]"
-        ]
-        
-        next_button = None
-        for selector in selectors:
-            try:
-                next_button = WebDriverWait(driver, timeout).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                if next_button:
-                    break
-            except:
-                continue
+        # Une seule attente sur toutes les variantes (CSS puis repli XPath)
+        try:
+            next_button = wait_for_next_button(driver, timeout=timeout, min_pace=0.3, max_pace=0.6)
+        except TimeoutException:
+            next_button = None
         
         if not next_button:
             logger.error("❌ Bouton Suivant introuvable")
             return False
         
-        # Vérifier si le bouton est désactivé
-        is_disabled = driver.execute_script(
-            "return arguments[0].disabled || arguments[0].hasAttribute('disabled');", 
-            next_button
-        )
-        if is_disabled:
-            logger.warning("⚠️ Le bouton Suivant est désactivé, attente supplémentaire...")
-            wait_random(2, 3)
-            is_disabled = driver.execute_script(
-                "return arguments[0].disabled || arguments[0].hasAttribute('disabled');", 
-                next_button
-            )
-            if is_disabled:
-                logger.error("❌ Le bouton Suivant reste désactivé")
-                return False
+        # Bouton encore désactivé : polling côté navigateur au lieu d'un délai fixe
+        if not wait_until_enabled(driver, next_button, timeout=3):
+            logger.error("❌ Le bouton Suivant reste désactivé")
+            return False
         
-        # Scroll et clic (optimisé pour vitesse)
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-        wait_random(0.3, 0.6)  # Optimisé pour vitesse
-        driver.execute_script("arguments[0].click();", next_button)
-        wait_random(0.5, 1)  # Optimisé pour vitesse
+        # Clic natif (la pause humaine est déjà faite par wait_for_clickable) ;
+        # la page suivante est attendue par l'appelant (wait_for_next_step), pas de délai fixe
+        native_click(driver, next_button)
+        invalidate_element_cache(driver)
         
         logger.debug("✅ Bouton Suivant cliqué")
         return True
         
     except Exception as e:
-        logger.error(f"❌ Erreur lors du clic sur Suivant: {e}")
+        logger.error("❌ Erreur lors du clic sur Suivant: %s", e)
         return False
 
 
-def validate_radio_selected(driver, element: WebElement, timeout: int = 2) -> bool:
+# Ne défile que si l'élément sort du viewport (évite un scroll inutile à chaque interaction)
+_SCROLL_IF_NEEDED_JS = """
+    function scrollIfNeeded(el) {
+        var r = el.getBoundingClientRect();
+        if (r.top < 0 || r.bottom > window.innerHeight) el.scrollIntoView({block: 'center'});
+    }
+"""
+
+_CLICK_SCRIPT = _SCROLL_IF_NEEDED_JS + """
+    scrollIfNeeded(arguments[0]);
+    arguments[0].click();
+"""
+
+
+def cdp_eval(driver, script: str, *args: Any) -> Any:
+    """
+    Exécute un script via CDP Runtime.evaluate, résultat renvoyé par valeur.
+    
+    Pour les lectures de valeurs primitives (chaînes, booléens, listes) : pas d'enveloppe
+    WebDriver autour du résultat. Les arguments doivent être sérialisables en JSON
+    (pas de WebElement) ; le script les lit dans arguments[i] comme avec execute_script.
+    
+    Raises:
+        RuntimeError: si le script lève une exception dans la page
+    """
+    expression = "(function() { %s }).apply(null, %s)" % (script, json.dumps(args))
+    response = driver.execute_cdp_cmd("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+    if 'exceptionDetails' in response:
+        raise RuntimeError(response['exceptionDetails'].get('text', 'Erreur JavaScript'))
+    return response.get('result', {}).get('value')
+
+
+def js_click(driver, element: WebElement) -> None:
+    """Défile si nécessaire puis clique via JS, en un seul aller-retour."""
+    driver.execute_script(_CLICK_SCRIPT, element)
+
+
+def native_click(driver, element: WebElement) -> None:
+    """
+    Clic WebDriver natif (une commande "element click", défilement compris) sur un bouton visible.
+    
+    Repli sur js_click si le bouton est recouvert (overlay) ou non interactif.
+    """
+    try:
+        element.click()
+    except (ElementClickInterceptedException, ElementNotInteractableException):
+        js_click(driver, element)
+
+
+# Définit forceSelect(radio) : réutilisable dans les scripts qui choisissent le radio côté navigateur
+FORCE_SELECT_JS = _SCROLL_IF_NEEDED_JS + """
+    function forceSelect(radio) {
+        scrollIfNeeded(radio);
+        var label = radio.closest('label');
+        if (label) label.click();
+        radio.click();
+        radio.checked = true;
+        radio.dispatchEvent(new Event('change', { bubbles: true }));
+        radio.dispatchEvent(new Event('click', { bubbles: true }));
+        return radio.checked;
+    }
+"""
+
+_FORCE_SELECT_SCRIPT = FORCE_SELECT_JS + """
+    return forceSelect(arguments[0]);
+"""
+
+
+def js_force_select(driver, element: WebElement) -> bool:
     """
-    Valide qu'un bouton radio est bien sélectionné.
+    Variante insistante de la sélection simple : clique aussi le label parent et
+    redéclenche click/change (certains widgets Medallia n'écoutent que le label).
     
     Returns:
-        True si sélectionné, False sinon
+        True si le radio est coché après l'opération, False sinon
     """
+    return bool(driver.execute_script(_FORCE_SELECT_SCRIPT, element))
+
+
+# Radio resté décoché après la sélection simple : repli forceSelect dans le même appel
+_SELECT_AND_NEXT_SCRIPT = FORCE_SELECT_JS + """
+    var checked = Array.from(arguments[0]).map(function(radio) {
+        scrollIfNeeded(radio);
+        radio.click();
+        radio.checked = true;
+        radio.dispatchEvent(new Event('change', { bubbles: true }));
+        return radio.checked || forceSelect(radio);
+    });
+    var btn = document.querySelector(arguments[1]) ||
+              document.evaluate(arguments[2], document, null,
+                                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!btn || btn.disabled || btn.hasAttribute('disabled') || !btn.offsetParent) {
+        return {checked: checked, clicked: false};
+    }
+    scrollIfNeeded(btn);
+    btn.click();
+    return {checked: checked, clicked: true};
+"""
+
+
+def select_radios_and_next(driver, elements: List[WebElement], timeout: int = 10) -> Tuple[List[bool], bool]:
+    """
+    Sélectionne des radios puis clique sur "Suivant" dans le même appel JavaScript.
+    
+    Si le bouton n'est pas encore cliquable (désactivé, masqué), on retombe sur
+    click_next_button qui attend qu'il le devienne.
+    
+    Args:
+        driver: Instance du WebDriver
+        elements: Radios à sélectionner (liste vide : seulement cliquer sur Suivant)
+        timeout: Attente maximale du bouton Suivant en cas de repli
+    
+    Returns:
+        (état coché de chaque radio dans l'ordre reçu, True si "Suivant" a été cliqué)
+    """
+    if not elements:
+        return [], click_next_button(driver, timeout=timeout)
+    
+    result = driver.execute_script(_SELECT_AND_NEXT_SCRIPT, elements,
+                                   CSS_SELECTORS['next_button'], NEXT_BUTTON_UNION_XPATH) or {}
+    checked = [bool(c) for c in result.get('checked') or []]
+    if not result.get('clicked'):
+        return checked, click_next_button(driver, timeout=timeout)
+    
+    invalidate_element_cache(driver)
+    logger.debug("✅ Bouton Suivant cliqué")
+    return checked, True
+
+
+def select_radio_and_next(driver, element: Optional[WebElement], timeout: int = 10) -> bool:
+    """
+    Version à un seul radio de select_radios_and_next.
+    
+    Args:
+        driver: Instance du WebDriver
+        element: Radio à sélectionner (None : seulement cliquer sur Suivant)
+        timeout: Attente maximale du bouton Suivant en cas de repli
+    
+    Returns:
+        True si "Suivant" a été cliqué, False sinon
+    """
+    checked, clicked = select_radios_and_next(driver, [element] if element is not None else [], timeout=timeout)
+    if element is not None and not all(checked):
+        logger.warning("⚠️ Validation du radio échouée")
+    return clicked
+
+
+_FILL_SCRIPT = """
+    var field = arguments[0];
+    field.value = arguments[1];
+    field.dispatchEvent(new Event('input', { bubbles: true }));
+    field.dispatchEvent(new Event('change', { bubbles: true }));
+    return field.value;
+"""
+
+
+def js_fill(driver, element: WebElement, text: str) -> str:
+    """
+    Remplit un champ en un seul aller-retour (valeur + événements input/change).
+    
+    Réservé aux champs déterministes (date, heure, code) : pas de frappe clavier simulée.
+    
+    Returns:
+        Valeur du champ relue après les événements (dans le même appel JS)
+    """
+    return driver.execute_script(_FILL_SCRIPT, element, text) or ''
+
+
+
+def fill_text_input(driver, element: WebElement, text: str, min_length: int = 1,
+                    relocate: Optional[Callable[[], WebElement]] = None, use_js: bool = False) -> bool:
+    """
+    Efface, saisit et valide un champ texte en réutilisant l'élément déjà trouvé.
+    
+    Args:
+        driver: Instance du driver
+        element: Élément input déjà localisé (pas de seconde recherche DOM)
+        text: Texte à saisir
+        min_length: Longueur minimale requise pour la validation
+        relocate: Fonction pour relocaliser l'élément s'il devient obsolète (une seule nouvelle tentative)
+        use_js: Remplit via js_fill au lieu de human_typing (une frappe CDP par caractère)
+    
+    Returns:
+        True si la valeur saisie est validée, False sinon
+    """
+    def _fill(el: WebElement) -> Optional[str]:
+        if use_js:
+            return js_fill(driver, el, text)
+        el.clear()
+        human_typing(el, text)
+        return None
+    
     try:
-        # Attendre un peu pour que la sélection se propage
-        time.sleep(0.3)
-        
-        # Vérifier via JavaScript
-        is_checked = driver.execute_script("return arguments[0].checked;", element)
-        
-        if not is_checked:
-            # Réessayer en cliquant directement
-            driver.execute_script("arguments[0].checked = true;", element)
-            driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", element)
-            time.sleep(0.2)
-            is_checked = driver.execute_script("return arguments[0].checked;", element)
-        
-        return is_checked
-    except Exception as e:
-        logger.warning(f"⚠️ Erreur lors de la validation du radio: {e}")
-        return False
+        value = _fill(element)
+    except StaleElementReferenceException:
+        if relocate is None:
+            raise
+        element = relocate()
+        value = _fill(element)
+    
+    if use_js:
+        # js_fill a déjà relu la valeur : pas de seconde lecture du DOM
+        value = value.strip()
+        return len(value) >= min_length and value == text.strip()
+    
+    return validate_text_input(driver, element, expected_text=text, min_length=min_length)
 
 
 def validate_text_input(driver, element: WebElement, expected_text: Optional[str] = None, min_length: int = 1) -> bool:
@@ -361,5 +826,5 @@ def validate_text_input(driver, element: WebElement, expected_text: Optional[str
         
         return True
     except Exception as e:
-        logger.warning(f"⚠️ Erreur lors de la validation du texte: {e}")
+        logger.warning("⚠️ Erreur lors de la validation du texte: %s", e)
         return False
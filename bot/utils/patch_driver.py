@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Patch unique du binaire chromedriver (suppression des variables cdc_ détectables)."""
+
+import hashlib
+import logging
+import os
+import random
+import re
+import shutil
+import string
+import sys
+import threading
+from typing import Optional
+
+from bot.config import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Variable injectée par chromedriver dans chaque page ($cdc_asdjflasutopfhvcZLmcfl_...)
+_CDC_PATTERN = re.compile(rb'cdc_[a-zA-Z0-9]{22}')
+
+_EXE_SUFFIX = '.exe' if sys.platform.startswith('win') else ''
+PATCHED_DRIVER_PATH = os.path.join(BASE_DIR, f"patched_chromedriver{_EXE_SUFFIX}")
+_VERSION_FILE = PATCHED_DRIVER_PATH + '.version'
+
+_patch_lock = threading.Lock()
+
+# Empreintes déjà calculées dans ce processus : (chemin, st_mtime_ns, st_size) -> SHA-256
+_digest_cache = {}
+
+
+def _random_token(length: int) -> bytes:
+    """Génère une chaîne aléatoire de même longueur que la variable remplacée."""
+    return ''.join(random.choices(string.ascii_letters, k=length)).encode('ascii')
+
+
+def _file_digest(path: str) -> str:
+    """Empreinte SHA-256 du binaire source (identifie la version de chromedriver)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_version(path: str) -> str:
+    """
+    Empreinte du chromedriver source, mémorisée par processus.
+
+    Le binaire n'est relu et haché que si son chemin, sa date de modification ou sa taille changent :
+    les sessions suivantes se contentent d'un os.stat.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    version = _digest_cache.get(key)
+    if version is None:
+        version = _digest_cache[key] = _file_digest(path)
+    return version
+
+
+def _is_patched_version(version: str) -> bool:
+    """Vrai si le binaire patché existant correspond à cette version du chromedriver source."""
+    if not (os.path.exists(PATCHED_DRIVER_PATH) and os.path.exists(_VERSION_FILE)):
+        return False
+    with open(_VERSION_FILE, 'r', encoding='utf-8') as f:
+        return f.read().strip() == version
+
+
+def get_patched_driver_path(source_path: Optional[str] = None) -> Optional[str]:
+    """
+    Retourne le chemin d'un chromedriver patché, en le créant si nécessaire.
+
+    Le patch n'est refait que si le binaire source change (mise à jour de chromedriver) :
+    le coût passe de « à chaque session » à « à chaque installation ».
+
+    Args:
+        source_path: Chemin du chromedriver d'origine (défaut: celui trouvé dans le PATH)
+
+    Returns:
+        Chemin du binaire patché, ou None si aucun chromedriver n'est disponible
+        (undetected_chromedriver télécharge et patche alors le sien)
+    """
+    source_path = source_path or shutil.which('chromedriver')
+    if not source_path or not os.path.exists(source_path):
+        return None
+
+    with _patch_lock:
+        tmp_path = f"{PATCHED_DRIVER_PATH}.{os.getpid()}.tmp"
+        try:
+            version = _source_version(source_path)
+
+            if _is_patched_version(version):
+                return PATCHED_DRIVER_PATH
+
+            with open(source_path, 'rb') as f:
+                content = f.read()
+
+            patched, count = _CDC_PATTERN.subn(lambda m: _random_token(len(m.group(0))), content)
+
+            # Écriture atomique : fichier temporaire propre au processus (les workers des lots
+            # en processus patchent en parallèle), puis remplacement
+            with open(tmp_path, 'wb') as f:
+                f.write(patched)
+            os.chmod(tmp_path, 0o755)
+
+            # Un autre processus a pu terminer le patch entre-temps (et son binaire tourner déjà :
+            # sous Windows, os.replace échouerait sur un exécutable en cours d'utilisation)
+            if _is_patched_version(version):
+                os.remove(tmp_path)
+                return PATCHED_DRIVER_PATH
+            os.replace(tmp_path, PATCHED_DRIVER_PATH)
+
+            version_tmp = f"{_VERSION_FILE}.{os.getpid()}.tmp"
+            with open(version_tmp, 'w', encoding='utf-8') as f:
+                f.write(version)
+            os.replace(version_tmp, _VERSION_FILE)
+
+            logger.info("✅ chromedriver patché (%s occurrence(s) cdc_ remplacée(s))", count)
+            return PATCHED_DRIVER_PATH
+
+        except Exception as e:
+            logger.warning("⚠️ Impossible de patcher chromedriver, patch automatique utilisé: %s", e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
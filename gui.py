@@ -9,6 +9,7 @@ from tkinter import ttk, scrolledtext, messagebox
 import threading
 import queue
 import json
+import math
 import os
 import logging
 from datetime import datetime, timedelta
@@ -37,9 +38,9 @@ except ImportError:
 sys.path.append(str(Path(__file__).parent))
 
 from bot.config_loader import config
-from bot.utils.driver_manager import setup_driver, cleanup_driver
+from bot.utils.driver_manager import cleanup_driver, create_survey_context, dispose_context, driver_pool
 from bot.utils.helpers import wait_with_check
-from bot.survey_runner import run_survey_bot, get_session_data
+from bot.survey_runner import run_survey_bot, SurveyState
 from bot.scheduler import scheduler
 from bot.utils.discord_notifier import discord_notifier
 
@@ -68,7 +69,6 @@ class QueueHandler(logging.Handler):
     # Messages à filtrer (trop verbeux ou inutiles)
     FILTERED_MESSAGES = [
         '📋 Catégorie reçue:',
-        '📋 session_data complet:',
         '📁 Fichier d\'avis sélectionné:',
         '🔧 Création du driver Chrome...',
         '🎨 Application des paramètres de furtivité...',
@@ -1592,11 +1592,11 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
         
         self.log("🛑 Arrêt du bot demandé...", 'warning')
         
-        # Fermer le driver si ouvert
+        # Rendre le driver au pool (Chrome reste ouvert pour la prochaine session)
         if self.driver:
             try:
-                cleanup_driver(self.driver)
-                self.driver = None
+                driver, self.driver = self.driver, None
+                driver_pool.release(driver)
             except:
                 pass
     
@@ -1618,7 +1618,7 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
             # Initialiser le navigateur
             self.log("🌐 Initialisation du navigateur...", 'info')
             chrome_options = config.get_chrome_options()
-            self.driver = setup_driver(chrome_options)
+            self.driver = driver_pool.acquire(chrome_options)
             
             if not self.driver:
                 self.log("❌ Impossible d'initialiser le navigateur", 'error')
@@ -1651,7 +1651,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                         scheduler.set_next_scheduled_time(next_run)
                         if next_run:
                             import time as time_module
-                            wait_seconds = int((next_run - datetime.now()).total_seconds())
+                            # Arrondi supérieur : un réveil une fraction de seconde trop tôt ne doit pas arrêter le bot
+                            wait_seconds = math.ceil((next_run - datetime.now()).total_seconds())
                             
                             if wait_seconds > 0:
                                 self.log(f"⏰ Prochain run: {next_run.strftime('%d/%m/%Y à %H:%M')}", 'info')
@@ -1686,11 +1687,19 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                     
                     # Charger la page
                     self.log("🌍 Chargement de la page...", 'info')
+                    context_id = None
                     try:
+                        # Navigateur rendu au pool après le questionnaire précédent : le reprendre
+                        if not self.driver:
+                            self.driver = driver_pool.acquire(chrome_options)
                         if not self.driver:
                             self.log("❌ Le driver n'est pas initialisé", 'error')
                             break
                         
+                        # Chaque questionnaire tourne dans son propre BrowserContext (cookies/stockage
+                        # vierges, Chrome reste lancé)
+                        context_id = create_survey_context(self.driver, chrome_options)
+                        
                         self.driver.get(survey_url)
                         import time
                         time.sleep(random.uniform(1, 2))  # Optimisé pour vitesse
@@ -1708,6 +1717,7 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                             self.log(f"❌ Impossible de charger l'URL du questionnaire. URL actuelle: {current_url}", 'error')
                             self.stats['failed'] += 1
                             self.save_stats()
+                            dispose_context(self.driver, context_id)
                             continue
                         
                         self.log(f"✅ Page chargée: {current_url[:80]}...", 'success')
@@ -1715,6 +1725,7 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                         self.log(f"❌ Erreur lors du chargement de la page: {e}", 'error')
                         self.stats['failed'] += 1
                         self.save_stats()
+                        dispose_context(self.driver, context_id)
                         continue
                     
                     # Exécuter le bot
@@ -1744,7 +1755,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                         except:
                             pass
                         chrome_options = config.get_chrome_options()
-                        self.driver = setup_driver(chrome_options)
+                        self.driver = driver_pool.acquire(chrome_options)
+                        context_id = None  # Contexte perdu avec l'ancien navigateur
                         if not self.driver:
                             self.log("❌ Impossible de réinitialiser le navigateur", 'error')
                             break
@@ -1753,12 +1765,16 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                     # Vérifier la santé du driver pendant l'exécution (détection proactive de crash)
                     success = False
                     captcha_detected = False
+                    survey_state = SurveyState()
+                    
+                    # Page chargée, questionnaire lancé : la tentative compte pour l'écart minimal,
+                    # même si elle échoue (les échecs de chargement restent réessayés aussitôt)
+                    scheduler.record_attempt()
                     try:
-                        success = run_survey_bot(self.driver)
+                        success = run_survey_bot(self.driver, survey_state)
                         
                         # Vérifier si un CAPTCHA a été détecté (#17)
-                        session_data = get_session_data()
-                        if session_data.get('captcha_detected'):
+                        if survey_state.captcha_detected:
                             captcha_detected = True
                             success = False
                     except Exception as e:
@@ -1770,7 +1786,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                             except:
                                 pass
                             chrome_options = config.get_chrome_options()
-                            self.driver = setup_driver(chrome_options)
+                            self.driver = driver_pool.acquire(chrome_options)
+                            context_id = None  # Contexte perdu avec l'ancien navigateur
                             if not self.driver:
                                 self.log("❌ Impossible de réinitialiser le navigateur après crash", 'error')
                                 self.stats['failed'] += 1
@@ -1782,8 +1799,15 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                         else:
                             # Autre erreur - la propager
                             self.log(f"❌ Erreur lors de l'exécution: {e}", 'error')
+                            dispose_context(self.driver, context_id)
                             raise
                     
+                    # Fermer le contexte du questionnaire (cookies/stockage jetés avec lui), puis rendre
+                    # le navigateur au pool : cookies, stockage et cache vidés entre deux questionnaires
+                    dispose_context(self.driver, context_id)
+                    driver, self.driver = self.driver, None
+                    driver_pool.release(driver)
+                    
                     self.log("─" * 60, 'info')
                     
                     # Gérer la détection de CAPTCHA (#17)
@@ -1798,9 +1822,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                     # Mettre à jour les stats
                     self.stats['total'] += 1
                     
-                    # Récupérer la catégorie technique réelle depuis session_data
-                    session_data = get_session_data()
-                    technical_category = session_data.get('current_category', category)
+                    # Récupérer la catégorie technique réelle depuis l'état du questionnaire
+                    technical_category = survey_state.current_category or category
                     
                     # Mapper la catégorie technique vers la catégorie d'affichage
                     display_category = self.CATEGORY_MAPPING.get(technical_category, category)
@@ -1915,7 +1938,7 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                         scheduler.set_next_scheduled_time(next_run)
                         if next_run:
                             import time as time_module
-                            wait_seconds = int((next_run - datetime.now()).total_seconds())
+                            wait_seconds = math.ceil((next_run - datetime.now()).total_seconds())
                             
                             if wait_seconds > 0:
                                 next_category = random.choice(categories)
@@ -1943,7 +1966,7 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                     scheduler.set_next_scheduled_time(next_run)
                     if next_run:
                         import time as time_module
-                        wait_seconds = int((next_run - datetime.now()).total_seconds())
+                        wait_seconds = math.ceil((next_run - datetime.now()).total_seconds())
                         
                         if wait_seconds > 0:
                             next_category = random.choice(categories)
@@ -1981,10 +2004,10 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
             self.log(f"❌ Erreur critique: {e}", 'error')
         
         finally:
-            # Nettoyer
+            # Rendre le driver au pool (réutilisé au prochain démarrage)
             if self.driver:
-                cleanup_driver(self.driver)
-                self.driver = None
+                driver, self.driver = self.driver, None
+                driver_pool.release(driver)
             
             self.bot_running = False
             self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
@@ -2724,9 +2747,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
                 f.write(content)
             
             # Invalider le cache
-            from bot.utils.avis_manager import avis_manager
-            if avis_file in avis_manager._cache:
-                del avis_manager._cache[avis_file]
+            from bot.automation import get_avis_manager
+            get_avis_manager().invalidate()
             
             self.log(f"✅ Avis sauvegardés pour {category}", 'success')
             
@@ -2736,8 +2758,8 @@ Prêt à démarrer ! Cliquez sur "▶️ Lancer le Bot" pour commencer.
     def _validate_avis_files_startup(self):
         """Valide les fichiers d'avis au démarrage (#12)."""
         try:
-            from bot.utils.avis_manager import avis_manager
-            results = avis_manager.validate_avis_files()
+            from bot.automation import get_avis_manager
+            results = get_avis_manager().validate_avis_files()
             
             invalid_files = []
             for category, (is_valid, message) in results.items():
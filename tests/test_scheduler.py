@@ -0,0 +1,62 @@
+"""Tests du planificateur de questionnaires (bot/scheduler.py)."""
+
+from datetime import datetime
+
+import pytest
+
+from bot.scheduler import QuestionnaireScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    """Planificateur isolé, avec son fichier d'état dans un répertoire temporaire."""
+    sched = QuestionnaireScheduler.__new__(QuestionnaireScheduler)
+    sched.data_file = tmp_path / "scheduler_data.json"
+    sched._dirty = False
+    sched._last_save = 0.0
+    sched._status_cache = None
+    sched._load_data()
+    return sched
+
+
+def test_slot_in_same_minute_as_gap_end_is_not_before_now(scheduler):
+    """Un créneau dans la minute de fin d'écart ne doit jamais donner une attente négative."""
+    now = datetime(2026, 10, 16, 15, 15, 29, 500000)
+    scheduler.last_reset_date = now.date()
+    scheduler.today_count = 2
+    scheduler.scheduled_times = ["12:00", "13:30", "15:15", "17:00", "19:00", "21:00"]
+    scheduler.record_attempt(datetime(2026, 10, 16, 14, 5, 30))
+
+    can_run, _ = scheduler.can_run_questionnaire(now)
+    next_run = scheduler.calculate_next_run_time(now)
+
+    assert not can_run
+    assert next_run == datetime(2026, 10, 16, 15, 15, 30)
+    assert next_run >= now
+    # Le créneau de la minute courante est conservé, pas re-tiré
+    assert scheduler.scheduled_times[2] == "15:15"
+
+
+def test_passed_slot_is_replanned_after_minimum_gap(scheduler):
+    """Un créneau dépassé est re-tiré, au plus tôt MIN_GAP_MINUTES après la dernière tentative."""
+    now = datetime(2026, 10, 16, 16, 0)
+    scheduler.last_reset_date = now.date()
+    scheduler.today_count = 2
+    scheduler.scheduled_times = ["12:00", "13:30", "15:15", "17:00", "19:00", "21:00"]
+    scheduler.record_attempt(datetime(2026, 10, 16, 15, 30))
+
+    next_run = scheduler.calculate_next_run_time(now)
+
+    assert next_run >= datetime(2026, 10, 16, 16, 40)
+    assert scheduler.scheduled_times[:2] == ["12:00", "13:30"]
+
+
+def test_status_is_read_only_and_follows_last_attempt(scheduler):
+    """Lire le statut ne tire pas de planning, et une nouvelle tentative invalide le cache."""
+    scheduler.get_status()
+    assert scheduler.scheduled_times == []
+
+    cached = scheduler._status_cache
+    scheduler.record_attempt()
+    scheduler.get_status()
+    assert scheduler._status_cache is not cached